@@ -0,0 +1,98 @@
+"""
+Benchmark of `scripts.analytics` on a synthetic history.
+
+Usage:
+    python -m bench.bench_analytics [n_bids]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from scripts.analytics import (
+    BidHistory,
+    RoundHistory,
+    bid_curves,
+    bidder_aggregates,
+    burned_supply,
+    increment_stats,
+    song_aggregates,
+    time_to_final_bid,
+)
+
+ROUND_DURATION = 60 * 60 * 24
+
+
+def synthetic_history(n_bids, n_rounds, n_bidders=5_000, n_songs=20_000, seed=0):
+    """
+    Builds a history shaped like the chain's: strictly increasing bids
+    spread over consecutive rounds, with the last round still open.
+    """
+    rng = np.random.default_rng(seed)
+    round_id = np.sort(rng.integers(0, n_rounds, n_bids)).astype(np.uint64)
+    start_time = np.arange(n_rounds, dtype=np.int64) * (ROUND_DURATION + 30)
+    elapsed = rng.integers(0, ROUND_DURATION, n_bids)
+    # Sort by elapsed time within each round and make amounts increase.
+    order = np.lexsort((elapsed, round_id))
+    elapsed = elapsed[order]
+    steps = rng.integers(1, 10**18, n_bids).astype(np.float64)
+    amount = np.cumsum(steps)
+    first = np.flatnonzero(np.diff(round_id, prepend=np.uint64(n_rounds)))
+    amount -= np.repeat(amount[first] - steps[first], np.diff(np.append(first, n_bids)))
+
+    bidders = np.array([f"0x{i:040x}" for i in range(n_bidders)])
+    songs = np.array(
+        [f"https://open.spotify.com/embed/track/{i}" for i in range(n_songs)]
+    )
+    bids = BidHistory(
+        round_id=round_id,
+        timestamp=start_time[round_id.astype(np.int64)] + elapsed,
+        amount=amount,
+        bidder=rng.integers(0, n_bidders, n_bids).astype(np.int32),
+        song=rng.integers(0, n_songs, n_bids).astype(np.int32),
+        bidders=bidders,
+        songs=songs,
+    )
+
+    last = np.zeros(n_rounds, dtype=np.float64)
+    np.maximum.at(last, round_id.astype(np.int64), amount)
+    ended = np.ones(n_rounds, dtype=bool)
+    ended[-1] = False
+    rounds = RoundHistory(
+        id=np.arange(n_rounds, dtype=np.uint64),
+        start_time=start_time,
+        end_time=start_time + ROUND_DURATION,
+        highest_bid=last,
+        ended=ended,
+    )
+    return bids, rounds
+
+
+def bench(name, fn, *args, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<22} {best * 1e3:10.2f} ms")
+
+
+def main(n_bids=1_000_000):
+    n_rounds = max(n_bids // 100, 1)
+    start = time.perf_counter()
+    bids, rounds = synthetic_history(n_bids, n_rounds)
+    print(
+        f"{n_bids} bids over {n_rounds} rounds (generated in {time.perf_counter() - start:.2f} s)"
+    )
+
+    bench("bid_curves", bid_curves, bids, rounds)
+    bench("time_to_final_bid", time_to_final_bid, bids, rounds)
+    bench("increment_stats", increment_stats, bids)
+    bench("burned_supply", burned_supply, rounds)
+    bench("song_aggregates", song_aggregates, bids, rounds)
+    bench("bidder_aggregates", bidder_aggregates, bids, rounds)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
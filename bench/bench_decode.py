@@ -0,0 +1,146 @@
+"""
+Benchmark of `scripts.decode` against ape's generic decoding, on
+synthetic `rounds` return data and `SongBid` logs.
+
+ape takes tens of microseconds per record, so it is only timed on the
+first `n_ape` records and its rate is extrapolated to `n`.
+
+Usage:
+    python -m bench.bench_decode [n] [n_ape]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from scripts.artifacts import container
+from scripts.decode import (
+    SONG_BID_TOPIC,
+    decode_round,
+    decode_song_bid,
+    rounds_array,
+    song_bids_array,
+)
+
+WORD = 32
+ROUND_TYPE = (
+    "(uint256,address,uint256,bool,uint256,uint256,(string,string,bytes32,string))"
+)
+
+
+def _songs(n, rng):
+    return [
+        (
+            f"Song {i}",
+            f"Artist {i % 97}",
+            rng.bytes(WORD),
+            f"https://open.spotify.com/embed/track/{i:022d}?utm_source=generator",
+        )
+        for i in range(n)
+    ]
+
+
+def synthetic_rounds(n, n_templates=1_000, seed=0):
+    """
+    Returns `n` `rounds` return datas. A pool of templates is encoded once
+    with `eth_abi` and each record patches its own id and amount in.
+    """
+    from eth_abi import encode
+
+    rng = np.random.default_rng(seed)
+    bidders = [rng.bytes(20) for _ in range(n_templates)]
+    templates = [
+        encode(
+            [ROUND_TYPE],
+            [(0, bidder, 0, True, 1_700_000_000, 1_700_086_400, song)],
+        )
+        for bidder, song in zip(bidders, _songs(n_templates, rng))
+    ]
+    amounts = rng.integers(1, 10**6, size=n).tolist()
+    datas = []
+    for i in range(n):
+        data = bytearray(templates[i % n_templates])
+        data[WORD : 2 * WORD] = i.to_bytes(WORD, "big")
+        data[3 * WORD : 4 * WORD] = (amounts[i] * 10**15).to_bytes(WORD, "big")
+        datas.append(bytes(data))
+    return datas
+
+
+def synthetic_logs(n, n_bidders=5_000, n_songs=1_000, seed=0):
+    """
+    Returns `n` raw `SongBid` logs shaped like `eth_getLogs` results.
+    """
+    from eth_abi import encode
+
+    rng = np.random.default_rng(seed)
+    bidders = [rng.bytes(20) for _ in range(n_bidders)]
+    payloads = [
+        encode(
+            ["address", "(string,string,bytes32,string)"],
+            [bidders[i % n_bidders], song],
+        )
+        for i, song in enumerate(_songs(n_songs, rng))
+    ]
+    address = "0x0d0902dc4970556e2BE2C97f507DFD14B15F51c0"
+    amounts = rng.integers(1, 10**6, size=n).tolist()
+    return [
+        {
+            "address": address,
+            "blockNumber": i // 4,
+            "blockHash": b"\0" * WORD,
+            "transactionHash": i.to_bytes(WORD, "big"),
+            "transactionIndex": i % 4,
+            "logIndex": i % 4,
+            "topics": [
+                SONG_BID_TOPIC,
+                (i // 50).to_bytes(WORD, "big"),
+                (amounts[i] * 10**15).to_bytes(WORD, "big"),
+            ],
+            "data": payloads[i % n_songs],
+        }
+        for i in range(n)
+    ]
+
+
+def _time(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench(n, n_ape):
+    from ape import networks
+
+    contract_type = container("auction").contract_type
+    ecosystem = networks.ethereum
+    rounds_abi = contract_type.view_methods["rounds"]
+    song_bid_abi = contract_type.events["SongBid"]
+
+    datas = synthetic_rounds(n)
+    logs = synthetic_logs(n)
+    scale = n / min(n, n_ape)
+    return {
+        "rounds: ape": scale
+        * _time(
+            lambda: [
+                ecosystem.decode_returndata(rounds_abi, data) for data in datas[:n_ape]
+            ]
+        ),
+        "rounds: records": _time(lambda: [decode_round(data) for data in datas]),
+        "rounds: array": _time(lambda: rounds_array(datas)),
+        "logs: ape": scale
+        * _time(lambda: list(ecosystem.decode_logs(logs[:n_ape], song_bid_abi))),
+        "logs: records": _time(lambda: [decode_song_bid(log) for log in logs]),
+        "logs: array": _time(lambda: song_bids_array(logs)),
+    }
+
+
+def main(n=100_000, n_ape=10_000):
+    print(f"{n} records (ape extrapolated from {min(n, n_ape)})")
+    for name, seconds in bench(n, n_ape).items():
+        print(f"{name:<16} {seconds * 1e3:9.1f} ms  {n / seconds:>12,.0f} records/s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
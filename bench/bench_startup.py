@@ -0,0 +1,86 @@
+"""
+Startup benchmark of short-lived jobs: resolving contracts through the
+ape project against the `scripts.artifacts` cache.
+
+Every case runs in a fresh interpreter, as a cron or CI job would, and
+reports the wall time of the whole process along with the time until its
+imports are done, its contract type is resolved and its first contract
+call returns on the local test chain. The local test provider itself
+takes over a second to start (py-evm), which a job on a remote network
+does not pay, so compare the `resolve` columns.
+
+Usage:
+    python -m bench.bench_startup [repeat]
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+from scripts.artifacts import CONTRACTS, PROJECT_ROOT, load_contract_type
+
+# Each case prints how many seconds after start its imports were done,
+# its contract was resolved and its first call returned.
+CASE = """
+import time
+start = time.perf_counter()
+{imports}
+imported = time.perf_counter()
+auction = {resolve}
+resolved = time.perf_counter()
+from ape import accounts, networks
+with networks.parse_network_choice("ethereum:local:test"):
+    sender = accounts.test_accounts[0]
+    auction.deploy(sender, 60, sender=sender).get_current_round_id()
+print(imported - start, resolved - start, time.perf_counter() - start)
+"""
+CASES = {
+    "project": CASE.format(
+        imports="from ape import project",
+        resolve="project.auction",
+    ),
+    "artifacts": CASE.format(
+        imports="from scripts.artifacts import container",
+        resolve='container("auction")',
+    ),
+}
+
+
+def run(source):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", source],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - start
+    return (wall, *map(float, result.stdout.split()[-3:]))
+
+
+def bench(repeat):
+    results = {}
+    for name, source in CASES.items():
+        runs = [run(source) for _ in range(repeat)]
+        results[name] = [statistics.median(column) for column in zip(*runs)]
+    return results
+
+
+def main(repeat=5):
+    # Warm both the cache and ape's own build output, so that neither
+    # path pays for a compile inside the timed runs.
+    for name in CONTRACTS:
+        load_contract_type(name)
+
+    print(f"{'case':<12}{'process':>10}{'import':>10}{'resolve':>10}{'first call':>12}")
+    for name, (wall, imported, resolved, first_call) in bench(repeat).items():
+        print(
+            f"{name:<12}{wall:>9.3f}s{imported:>9.3f}s"
+            f"{resolved:>9.3f}s{first_call:>11.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
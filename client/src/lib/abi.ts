@@ -217,6 +217,137 @@ export const auctionAbi = [
     stateMutability: "view",
     type: "function",
   },
+  {
+    inputs: [],
+    name: "BID_OK",
+    outputs: [
+      {
+        name: "",
+        type: "uint8",
+      },
+    ],
+    stateMutability: "view",
+    type: "function",
+  },
+  {
+    inputs: [],
+    name: "BID_ROUND_NOT_STARTED",
+    outputs: [
+      {
+        name: "",
+        type: "uint8",
+      },
+    ],
+    stateMutability: "view",
+    type: "function",
+  },
+  {
+    inputs: [],
+    name: "BID_ROUND_IS_OVER",
+    outputs: [
+      {
+        name: "",
+        type: "uint8",
+      },
+    ],
+    stateMutability: "view",
+    type: "function",
+  },
+  {
+    inputs: [],
+    name: "BID_TOO_LOW",
+    outputs: [
+      {
+        name: "",
+        type: "uint8",
+      },
+    ],
+    stateMutability: "view",
+    type: "function",
+  },
+  {
+    inputs: [],
+    name: "BID_INVALID_SONG_URL",
+    outputs: [
+      {
+        name: "",
+        type: "uint8",
+      },
+    ],
+    stateMutability: "view",
+    type: "function",
+  },
+  {
+    inputs: [],
+    name: "BID_INSUFFICIENT_ALLOWANCE",
+    outputs: [
+      {
+        name: "",
+        type: "uint8",
+      },
+    ],
+    stateMutability: "view",
+    type: "function",
+  },
+  {
+    inputs: [],
+    name: "BID_INSUFFICIENT_BALANCE",
+    outputs: [
+      {
+        name: "",
+        type: "uint8",
+      },
+    ],
+    stateMutability: "view",
+    type: "function",
+  },
+  {
+    inputs: [
+      {
+        name: "_bidder",
+        type: "address",
+      },
+      {
+        name: "_amount",
+        type: "uint256",
+      },
+      {
+        components: [
+          {
+            name: "title",
+            type: "string",
+          },
+          {
+            name: "artist",
+            type: "string",
+          },
+          {
+            name: "iframe_hash",
+            type: "bytes32",
+          },
+          {
+            name: "iframe_url",
+            type: "string",
+          },
+        ],
+        name: "_song",
+        type: "tuple",
+      },
+    ],
+    name: "preview_bid",
+    outputs: [
+      {
+        name: "",
+        type: "uint8",
+      },
+      {
+        name: "",
+        type: "uint256",
+      },
+    ],
+    stateMutability: "view",
+    type: "function",
+  },
   {
     inputs: [],
     name: "get_round_duration",
@@ -108,6 +108,18 @@ _latests_bidded_songs_index: public(HashMap[uint256, uint256])
 latests_bidded_songs: public(HashMap[uint256, Song[MAX_NUMBER_OF_LATESTS_BIDDED_SONGS]])
 
 
+# @dev We define the `preview_bid` reason codes.
+# @notice Why `bid` would revert, in the order `bid` checks it;
+#         `BID_OK` means it would not
+BID_OK: public(constant(uint8)) = 0
+BID_ROUND_NOT_STARTED: public(constant(uint8)) = 1
+BID_ROUND_IS_OVER: public(constant(uint8)) = 2
+BID_TOO_LOW: public(constant(uint8)) = 3
+BID_INVALID_SONG_URL: public(constant(uint8)) = 4
+BID_INSUFFICIENT_ALLOWANCE: public(constant(uint8)) = 5
+BID_INSUFFICIENT_BALANCE: public(constant(uint8)) = 6
+
+
 # @dev We define the `ROUND_DURATION` constant.
 # @notice Duration of each round in seconds
 ROUND_DURATION: immutable(uint256)
@@ -338,6 +350,38 @@ def get_current_round_highest_bid() -> uint256:
     return self.rounds[self._id].highest_bid
 
 
+@external
+@view
+def preview_bid(_bidder: address, _amount: uint256, _song: Song) -> (uint8, uint256):
+    """
+    @dev Evaluates the preconditions of `bid` for `_bidder` without bidding,
+         so a single call tells whether the transaction would revert. Only
+         the fields each check needs are read, not the whole round
+    @param _bidder The address that would send the bid
+    @param _amount The amount to bid in SongCoin tokens
+    @param _song The song to bid on
+    @return uint8 `BID_OK`, or the reason code of the first check that fails
+    @return uint256 The minimum amount that would be the highest bid
+    """
+    current_round_id: uint256 = self._id
+    min_amount: uint256 = self.rounds[current_round_id].highest_bid + 1
+
+    if block.timestamp < self.rounds[current_round_id].start_time:
+        return BID_ROUND_NOT_STARTED, min_amount
+    if block.timestamp >= self.rounds[current_round_id].end_time:
+        return BID_ROUND_IS_OVER, min_amount
+    if _amount < min_amount:
+        return BID_TOO_LOW, min_amount
+    if not self._check_song_url(_song.iframe_url):
+        return BID_INVALID_SONG_URL, min_amount
+    # `transferFrom` spends the allowance before moving the balance.
+    if staticcall songcoin.allowance(_bidder, self) < _amount:
+        return BID_INSUFFICIENT_ALLOWANCE, min_amount
+    if staticcall songcoin.balanceOf(_bidder) < _amount:
+        return BID_INSUFFICIENT_BALANCE, min_amount
+    return BID_OK, min_amount
+
+
 
 @external
 @view
@@ -0,0 +1,138 @@
+# pragma version ~=0.4.1
+"""
+@title Auction Factory
+@custom:contract-name auction_factory
+@author Rafael Abuawad (https://x.com/rabuawad_)
+@license MIT
+@notice This contract deploys `auction` instances (e.g. one per genre or region),
+        each with its own round duration, and keeps a registry of them.
+@dev Key features:
+     - Instances are created from an EIP-5202 blueprint of `auction`, so a new
+       instance only pays for its constructor instead of a full bytecode deployment
+     - Every instance burns the same SongCoin token
+     - Ownership of each instance is handed to the factory owner
+     - Registry of all instances and their names
+@custom:security Only the owner can create new auction instances.
+"""
+
+
+# @dev We import and initialise the `ownable` module.
+from snekmate.auth import ownable as ow
+initializes: ow
+
+
+# @dev The subset of the `auction` interface used by the factory.
+interface IAuction:
+    def transfer_ownership(new_owner: address): nonpayable
+
+
+# @notice Event emitted when a new auction instance is created
+# @param auction The address of the new auction instance
+# @param name The name of the new auction instance
+# @param round_duration The duration of each round of the new instance in seconds
+event AuctionCreated:
+    auction: indexed(address)
+    name: String[32]
+    round_duration: uint256
+
+
+# @dev We define the `MAX_NUMBER_OF_AUCTIONS` constant.
+# @notice Maximum number of auction instances the registry can hold
+MAX_NUMBER_OF_AUCTIONS: constant(uint256) = 1024
+
+
+# @dev We define the `blueprint` public variable.
+# @notice The address of the `auction` blueprint
+# @return address The blueprint address
+blueprint: public(immutable(address))
+
+
+# @dev We define the `songcoin` public variable.
+# @notice The address of the SongCoin token contract used by every instance
+# @return address The SongCoin token address
+songcoin: public(immutable(address))
+
+
+# @dev We define the `auctions` public variable.
+# @notice The registry of auction instances, in creation order
+# @return address The auction instance at the given index
+auctions: public(DynArray[address, MAX_NUMBER_OF_AUCTIONS])
+
+
+# @dev We define the `auction_names` public variable.
+# @notice Maps auction instances to their names
+# @return String The name of the given auction instance
+auction_names: public(HashMap[address, String[32]])
+
+
+# @dev We define the `is_auction` public variable.
+# @notice Indicates if an address is an auction instance created by this factory
+# @return bool True if the address was created by this factory, false otherwise
+is_auction: public(HashMap[address, bool])
+
+
+# @dev We export all `external` functions
+# from the `ownable` module.
+exports: ow.__interface__
+
+
+# @notice Creates a new auction factory contract
+# @param _blueprint The address of the `auction` blueprint
+# @param _songcoin The address of the SongCoin token contract
+@deploy
+def __init__(_blueprint: address, _songcoin: address):
+    """
+    @dev Initializes the factory with the `auction` blueprint
+         and the SongCoin token
+    @param _blueprint The address of the `auction` blueprint
+    @param _songcoin The address of the SongCoin token contract
+    """
+    blueprint = _blueprint
+    songcoin = _songcoin
+    ow.__init__()
+
+
+@external
+def create_auction(_name: String[32], _round_duration: uint256) -> address:
+    """
+    @dev Deploys a new `auction` instance from the blueprint
+    @notice Only the owner can create new auction instances
+    @param _name The name of the new instance (e.g. its genre or region)
+    @param _round_duration The duration of each round in seconds
+    @return address The address of the new auction instance
+    """
+    ow._check_owner()
+    assert _round_duration > 0, "auction_factory: invalid round duration"
+    assert len(self.auctions) < MAX_NUMBER_OF_AUCTIONS, "auction_factory: too many auctions"
+
+    instance: address = create_from_blueprint(blueprint, songcoin, _round_duration)
+
+    # The factory is the deployer, hand the instance over to our owner
+    extcall IAuction(instance).transfer_ownership(ow.owner)
+
+    self.auctions.append(instance)
+    self.auction_names[instance] = _name
+    self.is_auction[instance] = True
+
+    log AuctionCreated(auction=instance, name=_name, round_duration=_round_duration)
+    return instance
+
+
+@external
+@view
+def get_auctions() -> DynArray[address, MAX_NUMBER_OF_AUCTIONS]:
+    """
+    @dev Returns every auction instance created by this factory
+    @return DynArray Array of auction instances, in creation order
+    """
+    return self.auctions
+
+
+@external
+@view
+def get_auction_count() -> uint256:
+    """
+    @dev Returns the number of auction instances created by this factory
+    @return uint256 The number of auction instances
+    """
+    return len(self.auctions)
@@ -0,0 +1,352 @@
+"""
+Vectorized analytics over the auction's bid and round history.
+
+The history is loaded once into columnar NumPy arrays (`BidHistory` and
+`RoundHistory`) and every statistic below is computed with array
+operations, so the cost grows with the size of the arrays and never with
+a Python loop over individual bids.
+
+Amounts are kept as `float64` wei. That is lossy above 2**53 wei but is
+more than precise enough for distributions and aggregates; use the raw
+logs when exact integer amounts are needed.
+
+Usage:
+    ape run analytics --network <network-name>
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from scripts.decode import (
+    checksum_addresses,
+    fetch_block_timestamps,
+    fetch_song_bid_logs,
+    read_round_data,
+    rounds_array,
+    song_bids_array,
+)
+from scripts.reads import MULTICALL3_ADDRESS
+
+AUCTION_ADDRESS = "0x0d0902dc4970556e2BE2C97f507DFD14B15F51c0"
+
+
+@dataclass(frozen=True)
+class BidHistory:
+    """
+    Every `SongBid` as parallel columns, sorted by round (and by chain
+    order within a round). `bidder` and `song` are integer codes into the
+    `bidders` and `songs` lookup arrays.
+    """
+
+    round_id: np.ndarray
+    timestamp: np.ndarray
+    amount: np.ndarray
+    bidder: np.ndarray
+    song: np.ndarray
+    bidders: np.ndarray
+    songs: np.ndarray
+
+    def __len__(self):
+        return len(self.round_id)
+
+    @classmethod
+    def from_columns(cls, round_id, timestamp, amount, bidder, song):
+        """
+        Build the history from plain sequences given in chain order
+        (e.g. straight from the logs). Bidders and songs are categorically
+        encoded, songs are keyed by their iframe url.
+        """
+        round_id = np.asarray(round_id, dtype=np.uint64)
+        order = np.argsort(round_id, kind="stable")
+        bidders, bidder_codes = np.unique(
+            np.asarray(bidder, dtype=str), return_inverse=True
+        )
+        songs, song_codes = np.unique(np.asarray(song, dtype=str), return_inverse=True)
+        return cls(
+            round_id=round_id[order],
+            timestamp=np.asarray(timestamp, dtype=np.int64)[order],
+            amount=np.asarray(amount, dtype=np.float64)[order],
+            bidder=bidder_codes.astype(np.int32)[order],
+            song=song_codes.astype(np.int32)[order],
+            bidders=bidders,
+            songs=songs,
+        )
+
+
+@dataclass(frozen=True)
+class RoundHistory:
+    """
+    Every round as parallel columns, sorted by round id.
+    """
+
+    id: np.ndarray
+    start_time: np.ndarray
+    end_time: np.ndarray
+    highest_bid: np.ndarray
+    ended: np.ndarray
+
+    def __len__(self):
+        return len(self.id)
+
+    @classmethod
+    def from_columns(cls, id, start_time, end_time, highest_bid, ended):
+        id = np.asarray(id, dtype=np.uint64)
+        order = np.argsort(id, kind="stable")
+        return cls(
+            id=id[order],
+            start_time=np.asarray(start_time, dtype=np.int64)[order],
+            end_time=np.asarray(end_time, dtype=np.int64)[order],
+            highest_bid=np.asarray(highest_bid, dtype=np.float64)[order],
+            ended=np.asarray(ended, dtype=bool)[order],
+        )
+
+
+@dataclass(frozen=True)
+class BidCurves:
+    """
+    Per-round bid curves in CSR layout: the curve of `round_id[i]` is
+    `elapsed[offsets[i]:offsets[i + 1]]` against the matching `amount`
+    slice. `progress` is `elapsed` as a fraction of the round duration.
+    """
+
+    round_id: np.ndarray
+    offsets: np.ndarray
+    elapsed: np.ndarray
+    progress: np.ndarray
+    amount: np.ndarray
+
+    def curve(self, index):
+        start, stop = self.offsets[index], self.offsets[index + 1]
+        return self.elapsed[start:stop], self.amount[start:stop]
+
+
+@dataclass(frozen=True)
+class IncrementStats:
+    """
+    Summary of how much each bid raised the previous bid of its round.
+    """
+
+    count: int
+    mean: float
+    median: float
+    p90: float
+    max: float
+    mean_ratio: float
+
+
+@dataclass(frozen=True)
+class Aggregates:
+    """
+    Per-key (song or bidder) totals. `wins` counts ended rounds whose final
+    bid belongs to the key and `won_volume` sums those final bids, which is
+    the SONG that was burned on the key's behalf.
+    """
+
+    keys: np.ndarray
+    bids: np.ndarray
+    volume: np.ndarray
+    max_bid: np.ndarray
+    wins: np.ndarray
+    won_volume: np.ndarray
+
+
+def round_segments(bids):
+    """
+    Returns the round ids present in `bids` and the `offsets` delimiting
+    each round's contiguous slice of the history.
+    """
+    if len(bids) == 0:
+        return np.empty(0, dtype=np.uint64), np.zeros(1, dtype=np.int64)
+    starts = np.flatnonzero(np.diff(bids.round_id)) + 1
+    offsets = np.concatenate(([0], starts, [len(bids)])).astype(np.int64)
+    return bids.round_id[offsets[:-1]], offsets
+
+
+def _round_index(rounds, round_id):
+    index = np.searchsorted(rounds.id, round_id)
+    if np.any(index >= len(rounds)) or np.any(
+        rounds.id[np.minimum(index, len(rounds) - 1)] != round_id
+    ):
+        raise ValueError(
+            "analytics: bids reference rounds missing from the round history"
+        )
+    return index
+
+
+def bid_curves(bids, rounds):
+    """
+    Computes the bid curve (seconds since round start against bid amount)
+    for every round that received bids. Bids are strictly increasing
+    within a round on chain, so the amounts are already the running
+    highest bid.
+    """
+    round_id, offsets = round_segments(bids)
+    index = _round_index(rounds, bids.round_id)
+    start_time = rounds.start_time[index]
+    duration = (rounds.end_time - rounds.start_time)[index]
+    elapsed = bids.timestamp - start_time
+    return BidCurves(
+        round_id=round_id,
+        offsets=offsets,
+        elapsed=elapsed,
+        progress=elapsed / np.maximum(duration, 1),
+        amount=bids.amount,
+    )
+
+
+def time_to_final_bid(bids, rounds):
+    """
+    Returns `(round_id, since_start, before_end)`: for every round with
+    bids, the seconds from the round start to its final bid and from that
+    bid to the round's end time.
+    """
+    round_id, offsets = round_segments(bids)
+    last = bids.timestamp[offsets[1:] - 1]
+    index = _round_index(rounds, round_id)
+    return round_id, last - rounds.start_time[index], rounds.end_time[index] - last
+
+
+def increments(bids):
+    """
+    Returns the absolute increment of every bid over the previous bid in
+    the same round, along with the previous amount it was measured from.
+    """
+    same_round = bids.round_id[1:] == bids.round_id[:-1]
+    previous = bids.amount[:-1][same_round]
+    return bids.amount[1:][same_round] - previous, previous
+
+
+def increment_stats(bids):
+    """
+    Summarizes `increments` into an `IncrementStats`.
+    """
+    delta, previous = increments(bids)
+    if len(delta) == 0:
+        return IncrementStats(0, 0.0, 0.0, 0.0, 0.0, 0.0)
+    median, p90 = np.percentile(delta, [50, 90])
+    return IncrementStats(
+        count=len(delta),
+        mean=float(delta.mean()),
+        median=float(median),
+        p90=float(p90),
+        max=float(delta.max()),
+        mean_ratio=float((delta / np.maximum(previous, 1)).mean()),
+    )
+
+
+def burned_supply(rounds):
+    """
+    Returns `(timestamp, cumulative_burned)` for every ended round. The
+    highest bid is burned when the round is rolled, which is the start
+    time of the next round; the end time is used if that is unknown.
+    """
+    ended = np.flatnonzero(rounds.ended)
+    next_index = ended + 1
+    has_next = next_index < len(rounds)
+    burned_at = rounds.end_time[ended].copy()
+    burned_at[has_next] = rounds.start_time[next_index[has_next]]
+    return burned_at, np.cumsum(rounds.highest_bid[ended])
+
+
+def _aggregate(codes, keys, bids, rounds):
+    size = len(keys)
+    max_bid = np.zeros(size, dtype=np.float64)
+    np.maximum.at(max_bid, codes, bids.amount)
+
+    # The final bid of an ended round is the winning (and burned) bid.
+    round_id, offsets = round_segments(bids)
+    final = offsets[1:] - 1
+    final = final[rounds.ended[_round_index(rounds, round_id)]]
+
+    return Aggregates(
+        keys=keys,
+        bids=np.bincount(codes, minlength=size),
+        volume=np.bincount(codes, weights=bids.amount, minlength=size),
+        max_bid=max_bid,
+        wins=np.bincount(codes[final], minlength=size),
+        won_volume=np.bincount(
+            codes[final], weights=bids.amount[final], minlength=size
+        ),
+    )
+
+
+def song_aggregates(bids, rounds):
+    """
+    Per-song bid counts, bid volume, highest bid and rounds won.
+    """
+    return _aggregate(bids.song, bids.songs, bids, rounds)
+
+
+def bidder_aggregates(bids, rounds):
+    """
+    Per-bidder bid counts, bid volume, highest bid, rounds won and SONG
+    burned through winning bids.
+    """
+    return _aggregate(bids.bidder, bids.bidders, bids, rounds)
+
+
+def load_history(
+    auction, start_block=None, stop_block=None, multicall_address=MULTICALL3_ADDRESS
+):
+    """
+    Loads the bid history from the `SongBid` logs of `auction` and the
+    round history from its `rounds` getter, both decoded in bulk by
+    `scripts.decode`. Logs are read from `start_block`, the block the
+    auction was deployed in by default.
+    """
+    # perf: only import ape when history is loaded from a chain.
+    from ape import chain
+
+    if start_block is None:
+        creation = chain.contracts.get_creation_metadata(auction.address)
+        start_block = 0 if creation is None else creation.block
+
+    logs, songs = song_bids_array(fetch_song_bid_logs(auction, start_block, stop_block))
+
+    # One header per distinct block rather than one per log, in batches.
+    blocks, inverse = np.unique(logs["block_number"], return_inverse=True)
+    bids = BidHistory.from_columns(
+        logs["round_id"],
+        fetch_block_timestamps(blocks)[inverse],
+        logs["amount"],
+        checksum_addresses(logs["sender"]),
+        songs[logs["song"]],
+    )
+
+    ids = range(auction.get_current_round_id() + 1)
+    rows, _ = rounds_array(
+        read_round_data(auction, ids, multicall_address=multicall_address)
+    )
+    rounds = RoundHistory.from_columns(
+        rows["id"],
+        rows["start_time"],
+        rows["end_time"],
+        rows["highest_bid"],
+        rows["ended"],
+    )
+    return bids, rounds
+
+
+def main():
+    from scripts.artifacts import container
+
+    auction = container("auction").at(AUCTION_ADDRESS)
+    bids, rounds = load_history(auction)
+
+    _, since_start, before_end = time_to_final_bid(bids, rounds)
+    stats = increment_stats(bids)
+    _, burned = burned_supply(rounds)
+    bidders = bidder_aggregates(bids, rounds)
+
+    print(f"{len(bids)} bids over {len(rounds)} rounds")
+    if len(since_start):
+        print(f"median seconds to final bid: {np.median(since_start):.0f}")
+        print(f"median seconds left at final bid: {np.median(before_end):.0f}")
+    print(f"median bid increment: {stats.median / 1e18:.4f} SONG")
+    print(f"burned: {(burned[-1] if len(burned) else 0) / 1e18:.4f} SONG")
+    for i in np.argsort(bidders.volume)[::-1][:10]:
+        print(
+            f"{bidders.keys[i]}: {bidders.bids[i]} bids, "
+            f"{bidders.wins[i]} wins, {bidders.volume[i] / 1e18:.4f} SONG bid"
+        )
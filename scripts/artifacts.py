@@ -0,0 +1,129 @@
+"""
+Content-hashed cache of compiled contract artifacts.
+
+Resolving `project.auction` makes ape load the project manifest, check
+every source for changes and possibly recompile (snekmate imports
+included) before a single transaction goes out. Short-lived jobs can
+instead load the contract type straight from `.build/artifacts`, keyed
+by a hash of everything that affects compilation: the contract sources,
+`ape-config.yaml` and the locked dependency versions in `uv.lock`.
+
+A cache miss compiles once through ape and stores the result, so the
+cache is always safe to delete. Prebuild it in CI with:
+
+    ape run artifacts
+
+Scripts can also skip the `ape run` CLI entirely with `run_standalone`:
+
+    python -m scripts.deploy --network base:mainnet
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CONTRACTS = ("auction", "auction_factory", "mock_erc20")
+CACHE_DIR = Path(".build") / "artifacts"
+HASH_INPUTS = ("ape-config.yaml", "uv.lock")
+
+logger = logging.getLogger(__name__)
+
+
+def source_hash(root=PROJECT_ROOT):
+    """
+    Returns a hash of every input that affects compilation under `root`.
+    """
+    root = Path(root)
+    paths = sorted(
+        path
+        for pattern in ("*.vy", "*.vyi")
+        for path in (root / "contracts").rglob(pattern)
+    )
+    paths.extend(root / name for name in HASH_INPUTS if (root / name).exists())
+
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def artifact_path(name, root=PROJECT_ROOT, digest=None):
+    return Path(root) / CACHE_DIR / f"{name}-{digest or source_hash(root)}.json"
+
+
+def _compile(name):
+    from ape import project
+
+    return getattr(project, name).contract_type
+
+
+def load_contract_type(name, root=PROJECT_ROOT, compile=_compile):
+    """
+    Returns the `ContractType` of contract `name`, from the cache when
+    the sources are unchanged and compiled with `compile` otherwise. A
+    cached file that does not validate is treated as a miss.
+    """
+    from ethpm_types import ContractType
+    from pydantic import ValidationError
+
+    path = artifact_path(name, root)
+    if path.exists():
+        try:
+            return ContractType.model_validate_json(path.read_text())
+        except ValidationError:
+            logger.warning("artifacts: %s is invalid, recompiling", path)
+
+    contract_type = compile(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Every writer has its own temporary file, renamed into place once
+    # complete, so concurrent jobs never read or move each other's
+    # partial files.
+    partial = tempfile.NamedTemporaryFile(
+        "w", dir=path.parent, prefix=f"{path.stem}.", suffix=".partial", delete=False
+    )
+    try:
+        with partial:
+            partial.write(contract_type.model_dump_json(by_alias=True))
+        os.replace(partial.name, path)
+    except BaseException:
+        os.unlink(partial.name)
+        raise
+    return contract_type
+
+
+def container(name, root=PROJECT_ROOT):
+    """
+    Returns a `ContractContainer` for contract `name` without loading the
+    project, a drop-in replacement for `project.<name>`.
+    """
+    from ape.contracts import ContractContainer
+
+    return ContractContainer(load_contract_type(name, root))
+
+
+def run_standalone(main, argv=None):
+    """
+    Runs a script's `main` connected to `--network`, without going
+    through the `ape run` CLI and its script discovery.
+    """
+    from ape import networks
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--network", default=None)
+    args = parser.parse_args(argv)
+    with networks.parse_network_choice(args.network):
+        main()
+
+
+def main():
+    for name in CONTRACTS:
+        contract_type = load_contract_type(name)
+        path = artifact_path(name).relative_to(PROJECT_ROOT)
+        print(f"{name}: {path} ({len(contract_type.abi)} ABI entries)")
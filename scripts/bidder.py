@@ -0,0 +1,470 @@
+"""
+Transaction manager for automated bidders.
+
+A bid still pending when someone else outbids it can only revert with
+"auction: bid is too low", and its gas is paid all the same. The manager
+sends bids with locally tracked nonces, so several accounts can bid
+without waiting on each other or on the node's pending count, and
+follows every bid until it is mined. Each poll, run in a worker thread
+by `settle`, reads `get_current_round_highest_bid` and the new `SongBid`
+logs; a pending bid that has been outbid is replaced at the same nonce
+by a higher bid, up to its `max_amount`, and cancelled otherwise, or
+when the new leader is one of the manager's own accounts. Bids still
+pending when their round is over are cancelled too, and stuck ones get
+their fees bumped like the keeper's rolls. A bid that would need a
+cancel above the max fee cap is given up on and reported as stuck.
+
+Every settled bid reports its inclusion latency and the gas it wasted,
+i.e. spent on a transaction that did not leave a standing bid.
+
+Usage:
+    ape run bidder --network <network-name>
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from scripts.decode import decode_song_bid, fetch_song_bid_logs
+from scripts.transactions import (
+    FeePolicy,
+    Fees,
+    base_fee,
+    broadcast,
+    cancel_transaction,
+    gas_cost,
+    get_receipt,
+)
+
+AUCTION_ADDRESS = "0x0d0902dc4970556e2BE2C97f507DFD14B15F51c0"
+BIDDER_ACCOUNT = "songcoin"
+PRIORITY_FEE = 10_000_000  # 0.01 gwei
+MAX_FEE_CAP = 1_000_000_000  # 1 gwei
+INCREMENT = 10**18  # 1 SONG
+MAX_AMOUNT = 100 * 10**18  # 100 SONG
+POLL_INTERVAL = 1.0
+REPLACE_AFTER = 6.0
+GAS_HEADROOM_PERCENT = 25
+SONG = {
+    "title": "Songcoin",
+    "artist": "Songcoin",
+    "iframe_hash": "0x" + "00" * 32,
+    "iframe_url": "https://open.spotify.com/embed/track/4cOdK2wGLETKBW3PvgPWqT",
+}
+
+# How a bid ended up once one of its transactions was mined.
+PLACED = "placed"
+REVERTED = "reverted"
+CANCELLED = "cancelled"
+# Given up on while still pending, see `BidManager._cancel`.
+STUCK = "stuck"
+
+logger = logging.getLogger(__name__)
+
+
+def _pending_nonce(account):
+    from ape import chain
+
+    return chain.provider.web3.eth.get_transaction_count(account.address, "pending")
+
+
+class Nonces:
+    """
+    The next nonce of every account, read from the node once and tracked
+    locally from then on. `fetch` returns the node's nonce for an account.
+    """
+
+    def __init__(self, fetch=_pending_nonce):
+        self.fetch = fetch
+        self._next = {}
+
+    def reserve(self, account):
+        nonce = self._next.get(account.address)
+        if nonce is None:
+            nonce = self.fetch(account)
+        self._next[account.address] = nonce + 1
+        return nonce
+
+    def release(self, account, nonce):
+        """
+        Gives back a reserved `nonce` that was never broadcast. Only the
+        latest one can be reused, otherwise the node is asked again.
+        """
+        if self._next.get(account.address) == nonce + 1:
+            self._next[account.address] = nonce
+        else:
+            self._next.pop(account.address, None)
+
+
+@dataclass
+class PendingBid:
+    """
+    A bid being followed until one of the transactions sent with its
+    `nonce` is mined. `transactions` pairs each hash with the amount it
+    bids, `None` for the cancellation.
+    """
+
+    account: Any
+    nonce: int
+    round_id: int
+    song: Any
+    amount: int
+    max_amount: int
+    fees: Fees
+    submitted_at: float
+    submitted_block: int
+    sent_at: float
+    transactions: list = field(default_factory=list)
+    replacements: int = 0
+    cancelled: bool = False
+    outbid_by: str | None = None
+
+
+@dataclass(frozen=True)
+class BidResult:
+    """
+    Outcome of a bid. `latency` is how many seconds after submission its
+    mined transaction was seen and `blocks` how many blocks later. A
+    `STUCK` bid had nothing mined when it was given up on, so its gas is
+    0 and `txn_hash` is the last transaction sent.
+    """
+
+    bidder: str
+    round_id: int
+    amount: int | None
+    status: str
+    txn_hash: str
+    latency: float
+    blocks: int
+    gas_used: int
+    gas_cost: int
+    replacements: int = 0
+    outbid_by: str | None = None
+
+    @property
+    def wasted_gas(self):
+        return 0 if self.status == PLACED else self.gas_used
+
+    @property
+    def wasted_cost(self):
+        return 0 if self.status == PLACED else self.gas_cost
+
+
+@dataclass(frozen=True)
+class BidReport:
+    results: tuple
+
+    def count(self, status):
+        return sum(result.status == status for result in self.results)
+
+    @property
+    def wasted_gas(self):
+        return sum(result.wasted_gas for result in self.results)
+
+    @property
+    def wasted_cost(self):
+        return sum(result.wasted_cost for result in self.results)
+
+    def summary(self):
+        if not self.results:
+            return "no bids settled"
+        latency = [result.latency for result in self.results]
+        blocks = [result.blocks for result in self.results]
+        replacements = sum(result.replacements for result in self.results)
+        return "\n".join(
+            [
+                f"{len(self.results)} bids: {self.count(PLACED)} placed, "
+                f"{self.count(CANCELLED)} cancelled, {self.count(REVERTED)} reverted, "
+                f"{self.count(STUCK)} stuck, {replacements} replacements",
+                f"inclusion latency: median {statistics.median(latency):.1f}s "
+                f"({statistics.median(blocks):g} blocks), max {max(latency):.1f}s",
+                f"wasted gas: {self.wasted_gas} ({self.wasted_cost / 1e18:.6f} ETH)",
+            ]
+        )
+
+
+class BidManager:
+    """
+    Sends and follows bids on `auction` from any number of accounts.
+    `send` broadcasts a transaction and returns its hash; like `clock` and
+    `sleep` it is injectable so the manager can be driven in tests.
+    """
+
+    def __init__(
+        self,
+        auction,
+        fee_policy,
+        increment=INCREMENT,
+        nonces=None,
+        send=broadcast,
+        clock=time.time,
+        sleep=asyncio.sleep,
+        poll_interval=POLL_INTERVAL,
+        replace_after=REPLACE_AFTER,
+    ):
+        self.auction = auction
+        self.fee_policy = fee_policy
+        self.increment = increment
+        self.nonces = Nonces() if nonces is None else nonces
+        self.send = send
+        self.clock = clock
+        self.sleep = sleep
+        self.poll_interval = poll_interval
+        self.replace_after = replace_after
+        self.pending = []
+        self.results = []
+        # Every account that bid through the manager, which must never
+        # outbid one another.
+        self.accounts = set()
+        # Last block whose logs were read, and the latest bidder of each
+        # round seen in them.
+        self._block = None
+        self._leaders = {}
+        self._end_times = {}
+
+    def _bid_transaction(self, account, amount, song, nonce, fees):
+        # Estimating the gas also simulates the bid, so a bid that would
+        # revert on the current state raises instead of being sent. The
+        # headroom covers a refund to a bidder who gets in first.
+        gas = self.auction.bid.estimate_gas_cost(amount, song, sender=account)
+        return self.auction.bid.as_transaction(
+            amount,
+            song,
+            sender=account,
+            nonce=nonce,
+            gas_limit=gas * (100 + GAS_HEADROOM_PERCENT) // 100,
+            **fees.as_kwargs(),
+        )
+
+    def submit(self, account, amount, song, max_amount=None):
+        """
+        Sends a bid of `amount` from `account` and starts following it.
+        If it gets outbid while pending it is raised up to `max_amount`.
+        """
+        from ape import chain
+
+        round_id = self.auction.get_current_round_id()
+        nonce = self.nonces.reserve(account)
+        fees = self.fee_policy.initial(base_fee())
+        try:
+            txn_hash = self.send(
+                account, self._bid_transaction(account, amount, song, nonce, fees)
+            )
+        except Exception:
+            self.nonces.release(account, nonce)
+            raise
+
+        if self._block is None:
+            self._block = chain.blocks.height
+        now = self.clock()
+        bid = PendingBid(
+            account=account,
+            nonce=nonce,
+            round_id=round_id,
+            song=song,
+            amount=amount,
+            max_amount=amount if max_amount is None else max_amount,
+            fees=fees,
+            submitted_at=now,
+            submitted_block=chain.blocks.height,
+            sent_at=now,
+            transactions=[(txn_hash, amount)],
+        )
+        self.pending.append(bid)
+        self.accounts.add(account.address)
+        logger.info(
+            "bid of %d from %s sent with nonce %d", amount, account.address, nonce
+        )
+        return bid
+
+    def _end_time(self, round_id):
+        if round_id not in self._end_times:
+            self._end_times[round_id] = self.auction.get_round_end_time(round_id)
+        return self._end_times[round_id]
+
+    def _read_logs(self):
+        from ape import chain
+
+        head = chain.blocks.height
+        if self._block is not None and head > self._block:
+            for log in fetch_song_bid_logs(self.auction, self._block + 1, head + 1):
+                bid = decode_song_bid(log)
+                self._leaders[bid.round_id] = bid.sender
+        self._block = head
+
+    def poll(self):
+        """
+        Settles the pending bids that were mined and replaces or cancels
+        the ones that were outbid, stuck or are too late. Returns the
+        results settled by this poll.
+        """
+        self._read_logs()
+        round_id = self.auction.get_current_round_id()
+        highest_bid = self.auction.get_current_round_highest_bid()
+
+        settled = []
+        for bid in list(self.pending):
+            result = self._settle(bid)
+            if result is None and not bid.cancelled:
+                result = self._follow(bid, round_id, highest_bid)
+            if result is not None:
+                self.pending.remove(bid)
+                self.results.append(result)
+                settled.append(result)
+        return settled
+
+    def _settle(self, bid):
+        """
+        Returns the result of `bid` if any transaction sent with its nonce
+        was mined.
+        """
+        for txn_hash, amount in bid.transactions:
+            if (receipt := get_receipt(txn_hash)) is None:
+                continue
+            if amount is None:
+                status = CANCELLED
+            else:
+                status = PLACED if receipt["status"] == 1 else REVERTED
+            result = BidResult(
+                bidder=bid.account.address,
+                round_id=bid.round_id,
+                amount=amount,
+                status=status,
+                txn_hash=txn_hash,
+                latency=self.clock() - bid.submitted_at,
+                blocks=receipt["blockNumber"] - bid.submitted_block,
+                gas_used=receipt["gasUsed"],
+                gas_cost=gas_cost(receipt),
+                replacements=bid.replacements,
+                outbid_by=bid.outbid_by,
+            )
+            logger.info(
+                "bid from %s in round %d %s after %.1fs",
+                result.bidder,
+                result.round_id,
+                status,
+                result.latency,
+            )
+            return result
+        return None
+
+    def _follow(self, bid, round_id, highest_bid):
+        """
+        Replaces or cancels `bid` if needed. Returns its result if it was
+        given up on.
+        """
+        if round_id != bid.round_id or self.clock() >= self._end_time(bid.round_id):
+            # The bid can only revert with "auction: round is over".
+            return self._cancel(bid, "round is over")
+        elif (
+            highest_bid >= bid.amount
+            and (leader := self._leaders.get(round_id)) != bid.account.address
+        ):
+            bid.outbid_by = leader
+            amount = highest_bid + self.increment
+            if leader in self.accounts:
+                # Raising would only outbid ourselves, and the bid as it
+                # is can only revert.
+                return self._cancel(bid, f"outbid by managed account {leader}")
+            elif amount <= bid.max_amount:
+                return self._replace(bid, amount)
+            else:
+                return self._cancel(bid, f"outbid with {highest_bid}")
+        elif self.clock() - bid.sent_at >= self.replace_after:
+            return self._replace(bid, bid.amount)
+        return None
+
+    def _replace(self, bid, amount):
+        from ape.exceptions import ContractLogicError
+
+        bid.sent_at = self.clock()
+        if (fees := self.fee_policy.bump(bid.fees)) is None:
+            logger.warning("bid from %s stuck at the max fee cap", bid.account.address)
+            return None
+        try:
+            txn = self._bid_transaction(bid.account, amount, bid.song, bid.nonce, fees)
+        except ContractLogicError as err:
+            # e.g. the raised amount is above the balance or allowance.
+            return self._cancel(bid, err.revert_message or str(err))
+
+        bid.transactions.append((self.send(bid.account, txn), amount))
+        bid.fees = fees
+        bid.amount = amount
+        bid.replacements += 1
+        logger.info(
+            "bid from %s replaced with %d (%d)",
+            bid.account.address,
+            amount,
+            bid.replacements,
+        )
+        return None
+
+    def _cancel(self, bid, reason):
+        """
+        Replaces `bid` by a cancel. If its fees cannot be bumped any more
+        the node would reject the cancel, so the bid is given up on and its
+        `STUCK` result returned instead of following it forever.
+        """
+        from ape import chain
+
+        if (fees := self.fee_policy.bump(bid.fees)) is None:
+            logger.warning(
+                "bid from %s cannot be cancelled at the max fee cap, giving up: %s",
+                bid.account.address,
+                reason,
+            )
+            return BidResult(
+                bidder=bid.account.address,
+                round_id=bid.round_id,
+                amount=bid.amount,
+                status=STUCK,
+                txn_hash=bid.transactions[-1][0],
+                latency=self.clock() - bid.submitted_at,
+                blocks=chain.blocks.height - bid.submitted_block,
+                gas_used=0,
+                gas_cost=0,
+                replacements=bid.replacements,
+                outbid_by=bid.outbid_by,
+            )
+        txn = cancel_transaction(bid.account, bid.nonce, fees)
+        bid.transactions.append((self.send(bid.account, txn), None))
+        bid.fees = fees
+        bid.cancelled = True
+        logger.info("bid from %s cancelled: %s", bid.account.address, reason)
+        return None
+
+    def report(self):
+        return BidReport(tuple(self.results))
+
+    async def settle(self):
+        """
+        Polls until every pending bid is settled and returns the report.
+        """
+        while self.pending:
+            # ape's provider calls are blocking, so polls run in a worker
+            # thread like the feed's.
+            await asyncio.to_thread(self.poll)
+            if self.pending:
+                await self.sleep(self.poll_interval)
+        return self.report()
+
+
+def main():
+    from ape import accounts
+
+    from scripts.artifacts import container
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    auction = container("auction").at(AUCTION_ADDRESS)
+    manager = BidManager(
+        auction, FeePolicy(priority_fee=PRIORITY_FEE, max_fee_cap=MAX_FEE_CAP)
+    )
+    account = accounts.load(BIDDER_ACCOUNT)
+    account.set_autosign(True)
+    amount = auction.get_current_round_highest_bid() + INCREMENT
+    manager.submit(account, amount, SONG, max_amount=MAX_AMOUNT)
+
+    print(asyncio.run(manager.settle()).summary())
@@ -0,0 +1,406 @@
+"""
+Specialized ABI decoding of the auction's `Round`/`Song` structs and
+`SongBid` logs.
+
+ape decodes through the generic `eth_abi` machinery and wraps every
+value in pydantic models, which dominates the cost of reading thousands
+of rounds or logs. The layouts here are fixed, so the decoders below
+unpack the words they need straight out of the raw bytes with
+precompiled `struct` layouts, and a batch of rounds is sliced out of its
+Multicall3 response as `memoryview`s without copying it.
+
+Two shapes are available:
+
+- `decode_round`/`decode_song_bid` return compact `__slots__` records
+  with exact integer values, like ape's own structs.
+- `rounds_array`/`song_bids_array` join many records into one buffer and
+  gather each fixed-size field of all of them at once into NumPy
+  structured arrays. Amounts are `float64` wei
+  as in `scripts.analytics`; songs are encoded as integer codes into a
+  lookup of their iframe urls. As for any NumPy `S` field, reading an
+  address or hash out of them drops its trailing zero bytes.
+
+`read_round_data` and `fetch_song_bid_logs` fetch the raw bytes to feed
+them: rounds through one Multicall3 `aggregate3` call per batch, logs
+through `eth_getLogs`. `fetch_block_timestamps` reads the headers of the
+logs' blocks in JSON-RPC batches.
+"""
+
+import struct
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from scripts.reads import MULTICALL3_ADDRESS
+
+# keccak("SongBid(address,uint256,uint256,(string,string,bytes32,string))")
+SONG_BID_TOPIC = bytes.fromhex(
+    "f6ef7f26cbc029f216c74fb80ad9cfdc8b621e8751b23809c772dca09d95591b"
+)
+# keccak("rounds(uint256)")[:4]
+ROUNDS_SELECTOR = bytes.fromhex("8c65c81f")
+# keccak("aggregate3((address,bool,bytes)[])")[:4]
+AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")
+ROUNDS_PER_CALL = 500
+# Headers requested per JSON-RPC batch, within common provider limits.
+BLOCKS_PER_BATCH = 500
+
+WORD = 32
+
+# Heads of the fixed layouts. Values are kept as whole words so that any
+# uint256 decodes exactly; offsets and lengths are read from the low 8
+# bytes of their word, which is all a real one can use.
+_OFFSET = struct.Struct(">24xQ")
+_ROUND_HEAD = struct.Struct(">32s12x20s32s31x?32s32s24xQ")
+_SONG_HEAD = struct.Struct(">24xQ24xQ32s24xQ")
+_SONG_BID_HEAD = struct.Struct(">12x20s24xQ")
+_RESULT_HEAD = struct.Struct(">31x?24xQ")
+
+ROUND_DTYPE = np.dtype(
+    [
+        ("id", "<u8"),
+        ("highest_bidder", "S20"),
+        ("highest_bid", "<f8"),
+        ("ended", "?"),
+        ("start_time", "<i8"),
+        ("end_time", "<i8"),
+        ("iframe_hash", "S32"),
+        ("song", "<i4"),
+    ]
+)
+SONG_BID_DTYPE = np.dtype(
+    [
+        ("block_number", "<i8"),
+        ("log_index", "<i4"),
+        ("round_id", "<u8"),
+        ("amount", "<f8"),
+        ("sender", "S20"),
+        ("iframe_hash", "S32"),
+        ("song", "<i4"),
+    ]
+)
+
+
+# Not frozen: a frozen dataclass sets every field through
+# `object.__setattr__`, which doubles the cost of building a record.
+@dataclass(slots=True)
+class Song:
+    title: str
+    artist: str
+    iframe_hash: bytes
+    iframe_url: str
+
+
+@dataclass(slots=True)
+class Round:
+    id: int
+    highest_bidder: str
+    highest_bid: int
+    ended: bool
+    start_time: int
+    end_time: int
+    song: Song
+
+
+@dataclass(slots=True)
+class SongBid:
+    """
+    A `SongBid` log along with its position in the chain.
+    """
+
+    block_number: int
+    log_index: int
+    sender: str
+    round_id: int
+    amount: int
+    song: Song
+
+
+@lru_cache(maxsize=65536)
+def checksum_address(raw):
+    """
+    Returns the checksummed form of the 20-byte address `raw`. Bidders
+    repeat a lot, so the keccak behind it is cached.
+    """
+    from eth_utils import to_checksum_address
+
+    return to_checksum_address(raw)
+
+
+def _string(data, offset):
+    (length,) = _OFFSET.unpack_from(data, offset)
+    start = offset + WORD
+    return str(data[start : start + length], "utf-8")
+
+
+def decode_song(data, offset):
+    """
+    Decodes the `Song` tuple starting at byte `offset` of `data`.
+    """
+    title, artist, iframe_hash, iframe_url = _SONG_HEAD.unpack_from(data, offset)
+    return Song(
+        title=_string(data, offset + title),
+        artist=_string(data, offset + artist),
+        iframe_hash=iframe_hash,
+        iframe_url=_string(data, offset + iframe_url),
+    )
+
+
+def decode_round(data):
+    """
+    Decodes the return data of `rounds`, `get_current_round` or
+    `last_winning_round` into a `Round`.
+    """
+    (start,) = _OFFSET.unpack_from(data, 0)
+    id, highest_bidder, highest_bid, ended, start_time, end_time, song = (
+        _ROUND_HEAD.unpack_from(data, start)
+    )
+    return Round(
+        id=int.from_bytes(id, "big"),
+        highest_bidder=checksum_address(highest_bidder),
+        highest_bid=int.from_bytes(highest_bid, "big"),
+        ended=ended,
+        start_time=int.from_bytes(start_time, "big"),
+        end_time=int.from_bytes(end_time, "big"),
+        song=decode_song(data, start + song),
+    )
+
+
+def decode_song_bid(log):
+    """
+    Decodes a raw `SongBid` log, as returned by `eth_getLogs`, into a
+    `SongBid`.
+    """
+    topics = log["topics"]
+    data = log["data"]
+    sender, song = _SONG_BID_HEAD.unpack_from(data, 0)
+    return SongBid(
+        block_number=log["blockNumber"],
+        log_index=log["logIndex"],
+        sender=checksum_address(sender),
+        round_id=int.from_bytes(topics[1], "big"),
+        amount=int.from_bytes(topics[2], "big"),
+        song=decode_song(data, song),
+    )
+
+
+def _words(buffer, offsets):
+    """
+    Gathers the 32-byte words at byte `offsets` of `buffer` into an
+    `(n, 32)` array, without a Python loop.
+    """
+    return buffer[offsets[:, None] + np.arange(WORD)]
+
+
+def _uint64(words):
+    if words[:, : WORD - 8].any():
+        raise ValueError("decode: value does not fit in 64 bits")
+    return words[:, WORD - 8 :].copy().view(">u8").ravel()
+
+
+def _offset(words):
+    return _uint64(words).astype(np.int64)
+
+
+def _amount(words):
+    # Realistic token amounts fit in the low limb, but combining all four
+    # keeps the float right for any uint256.
+    limbs = words.copy().view(">u8").astype(np.float64)
+    return limbs @ np.array([2.0**192, 2.0**128, 2.0**64, 1.0])
+
+
+def _concat(chunks):
+    """
+    Returns `chunks` joined into one buffer, the same buffer as a `uint8`
+    array and the offset of each chunk in it.
+    """
+    lengths = np.fromiter((len(chunk) for chunk in chunks), np.int64, len(chunks))
+    starts = np.zeros(len(chunks), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    joined = b"".join(chunks)
+    return joined, np.frombuffer(joined, dtype=np.uint8), starts
+
+
+def _song_codes(joined, buffer, song_starts):
+    """
+    Returns the code of every song's iframe url and the urls they index,
+    in order of first appearance. Only the slicing of the url bytes is
+    left to Python.
+    """
+    urls = song_starts + _offset(_words(buffer, song_starts + 3 * WORD))
+    stops = urls + WORD + _offset(_words(buffer, urls))
+    songs = {}
+    codes = [
+        songs.setdefault(joined[start:stop], len(songs))
+        for start, stop in zip((urls + WORD).tolist(), stops.tolist())
+    ]
+    lookup = np.array([url.decode() for url in songs], dtype=str)
+    return np.array(codes, dtype=np.int32), lookup
+
+
+def rounds_array(datas):
+    """
+    Decodes many `rounds` return datas into a structured array of
+    `ROUND_DTYPE` and the iframe urls its `song` field indexes.
+    """
+    records = np.zeros(len(datas), dtype=ROUND_DTYPE)
+    if not datas:
+        return records, np.empty(0, dtype=str)
+
+    joined, buffer, starts = _concat(datas)
+    starts = starts + _offset(_words(buffer, starts))
+    records["id"] = _uint64(_words(buffer, starts))
+    records["highest_bidder"] = (
+        _words(buffer, starts + WORD)[:, 12:].copy().view("S20").ravel()
+    )
+    records["highest_bid"] = _amount(_words(buffer, starts + 2 * WORD))
+    records["ended"] = _words(buffer, starts + 3 * WORD)[:, -1] != 0
+    records["start_time"] = _uint64(_words(buffer, starts + 4 * WORD))
+    records["end_time"] = _uint64(_words(buffer, starts + 5 * WORD))
+
+    song_starts = starts + _offset(_words(buffer, starts + 6 * WORD))
+    records["iframe_hash"] = (
+        _words(buffer, song_starts + 2 * WORD).copy().view("S32").ravel()
+    )
+    records["song"], songs = _song_codes(joined, buffer, song_starts)
+    return records, songs
+
+
+def song_bids_array(logs):
+    """
+    Decodes many raw `SongBid` logs into a structured array of
+    `SONG_BID_DTYPE` and the iframe urls its `song` field indexes.
+    """
+    records = np.zeros(len(logs), dtype=SONG_BID_DTYPE)
+    if not logs:
+        return records, np.empty(0, dtype=str)
+
+    records["block_number"] = [log["blockNumber"] for log in logs]
+    records["log_index"] = [log["logIndex"] for log in logs]
+    _, round_ids, _ = _concat([log["topics"][1] for log in logs])
+    _, amounts, _ = _concat([log["topics"][2] for log in logs])
+    records["round_id"] = _uint64(round_ids.reshape(-1, WORD))
+    records["amount"] = _amount(amounts.reshape(-1, WORD))
+
+    joined, buffer, starts = _concat([log["data"] for log in logs])
+    records["sender"] = _words(buffer, starts)[:, 12:].copy().view("S20").ravel()
+    song_starts = starts + _offset(_words(buffer, starts + WORD))
+    records["iframe_hash"] = (
+        _words(buffer, song_starts + 2 * WORD).copy().view("S32").ravel()
+    )
+    records["song"], songs = _song_codes(joined, buffer, song_starts)
+    return records, songs
+
+
+def checksum_addresses(raw):
+    """
+    Converts an array of 20-byte addresses (e.g. the `sender` field) into
+    checksummed strings, hashing each distinct address once.
+    """
+    unique, inverse = np.unique(raw, return_inverse=True)
+    return np.array([checksum_address(a.ljust(20, b"\0")) for a in unique])[inverse]
+
+
+def split_aggregate3(data):
+    """
+    Splits the return data of Multicall3 `aggregate3` into the return data
+    of each call, as `memoryview`s into `data`. Raises `ValueError` if any
+    call failed.
+    """
+    view = memoryview(data)
+    (array,) = _OFFSET.unpack_from(view, 0)
+    (count,) = _OFFSET.unpack_from(view, array)
+    items = array + WORD
+    results = []
+    for i in range(count):
+        (item,) = _OFFSET.unpack_from(view, items + i * WORD)
+        success, result = _RESULT_HEAD.unpack_from(view, items + item)
+        if not success:
+            raise ValueError(f"decode: call {i} of the batch failed")
+        result += items + item
+        (length,) = _OFFSET.unpack_from(view, result)
+        results.append(view[result + WORD : result + WORD + length])
+    return results
+
+
+def read_round_data(
+    auction,
+    ids,
+    block_id=None,
+    multicall_address=MULTICALL3_ADDRESS,
+    batch=ROUNDS_PER_CALL,
+):
+    """
+    Returns the raw `rounds(id)` return data of every id in `ids`, read
+    with one `aggregate3` call per `batch` ids.
+    """
+    # perf: defer ape imports until a read is actually made.
+    from ape import chain
+    from eth_abi import encode
+
+    web3 = chain.provider.web3
+    block_id = "latest" if block_id is None else block_id
+    datas = []
+    for start in range(0, len(ids), batch):
+        calls = [
+            (auction.address, False, ROUNDS_SELECTOR + int(i).to_bytes(WORD, "big"))
+            for i in ids[start : start + batch]
+        ]
+        calldata = AGGREGATE3_SELECTOR + encode(["(address,bool,bytes)[]"], [calls])
+        data = web3.eth.call({"to": multicall_address, "data": calldata}, block_id)
+        datas.extend(split_aggregate3(data))
+    return datas
+
+
+def fetch_song_bid_logs(auction, start_block=0, stop_block=None, page=10_000):
+    """
+    Returns the raw `SongBid` logs of `auction` emitted in blocks
+    `[start_block, stop_block)`, requested `page` blocks at a time.
+    """
+    from ape import chain
+
+    if stop_block is None:
+        stop_block = chain.blocks.height + 1
+
+    web3 = chain.provider.web3
+    logs = []
+    for from_block in range(start_block, stop_block, page):
+        logs.extend(
+            web3.eth.get_logs(
+                {
+                    "address": auction.address,
+                    "topics": ["0x" + SONG_BID_TOPIC.hex()],
+                    "fromBlock": from_block,
+                    "toBlock": min(from_block + page, stop_block) - 1,
+                }
+            )
+        )
+    return logs
+
+
+def fetch_block_timestamps(numbers, batch=BLOCKS_PER_BATCH):
+    """
+    Returns the timestamps of the blocks `numbers` as an `int64` array,
+    with one JSON-RPC batch of `batch` headers per round trip. Providers
+    without batch support (e.g. eth-tester) get one request per block.
+    """
+    from ape import chain
+    from web3.exceptions import Web3TypeError
+
+    web3 = chain.provider.web3
+    numbers = [int(number) for number in numbers]
+    timestamps = []
+    for start in range(0, len(numbers), batch):
+        try:
+            requests = web3.batch_requests()
+        except Web3TypeError:
+            timestamps.extend(
+                web3.eth.get_block(number)["timestamp"] for number in numbers[start:]
+            )
+            break
+        with requests:
+            for number in numbers[start : start + batch]:
+                requests.add(web3.eth.get_block(number))
+            timestamps.extend(block["timestamp"] for block in requests.execute())
+    return np.array(timestamps, dtype=np.int64)
@@ -1,16 +1,48 @@
-from ape import accounts, project
+from scripts.artifacts import container, run_standalone
 
 
 def deploy_songcoin(deployer):
-    songcoin = project.mock_erc20.deploy(
+    songcoin = container("mock_erc20").deploy(
         "SongCoin", "SONG", 18, 1000000, "SongCoin", "1.0.0", sender=deployer
     )
     songcoin.mint(deployer, int(15_000e18), sender=deployer)
     return songcoin
 
 
+def deploy_auction_factory(deployer, songcoin, publish=True):
+    # Declare `auction` once as a blueprint, instances are then
+    # created from it by the factory.
+    blueprint = deployer.declare(container("auction")).contract_address
+    return container("auction_factory").deploy(
+        blueprint, songcoin, sender=deployer, publish=publish
+    )
+
+
+def deploy_auctions(deployer, songcoin, auctions, publish=True):
+    """
+    Deploys the factory and creates one instance per `(name,
+    round_duration)` in `auctions`. Returns the factory and the instance
+    addresses, in the order given. `publish` verifies the factory on the
+    network's explorer, which only live networks have.
+    """
+    factory = deploy_auction_factory(deployer, songcoin, publish=publish)
+    instances = []
+    for name, round_duration in auctions:
+        receipt = factory.create_auction(name, round_duration, sender=deployer)
+        instances.append(receipt.events.filter(factory.AuctionCreated)[0].auction)
+    return factory, instances
+
+
 def main():
+    # perf: importing `accounts` starts ape's managers, keep it out of
+    # module import.
+    from ape import accounts
+
     deployer = accounts.load("songcoin")
     songcoin = "0x5dfcf3458cc506be8d9d939d1fe1ddc0a54300a3"
     duration = 60 * 60 * 24  # 24 hours
-    project.auction.deploy(songcoin, duration, sender=deployer, publish=True)
+    container("auction").deploy(songcoin, duration, sender=deployer, publish=True)
+
+
+if __name__ == "__main__":
+    run_standalone(main)
@@ -0,0 +1,36 @@
+"""
+Deploys the auction factory and creates its auction instances.
+
+`auction` is declared once as a blueprint, then every instance in
+`AUCTIONS` is created by the factory from it, each with its own round
+duration.
+
+Usage:
+    ape run deploy_factory --network <network-name>
+"""
+
+from scripts.artifacts import run_standalone
+from scripts.deploy import deploy_auctions
+
+SONGCOIN_ADDRESS = "0x5dfcf3458cc506be8d9d939d1fe1ddc0a54300a3"
+# (name, round duration in seconds)
+AUCTIONS = (
+    ("daily", 60 * 60 * 24),
+    ("hourly", 60 * 60),
+)
+
+
+def main():
+    # perf: importing `accounts` starts ape's managers, keep it out of
+    # module import.
+    from ape import accounts
+
+    deployer = accounts.load("songcoin")
+    factory, instances = deploy_auctions(deployer, SONGCOIN_ADDRESS, AUCTIONS)
+    print(f"auction_factory: {factory.address}")
+    for (name, _), address in zip(AUCTIONS, instances):
+        print(f"{name}: {address}")
+
+
+if __name__ == "__main__":
+    run_standalone(main)
@@ -0,0 +1,333 @@
+"""
+Live auction event feed.
+
+A single poller follows new blocks, decodes `SongBid` logs and round
+transitions of the auction and fans them out to any number of
+Server-Sent Events subscribers. Upstream RPC load depends only on the
+block rate: each new block costs one header fetch, one `eth_getLogs` and
+one batched snapshot read, regardless of how many clients are connected.
+Every round rolled within a poll additionally costs a bisection over the
+window's headers to find its block, and a snapshot as of that block.
+
+Every subscriber has a bounded queue. A subscriber that falls behind has
+its backlog replaced by the latest snapshot (a "resync"), so a slow
+client can never stall the poller or grow the service's memory.
+
+Usage:
+    ape run feed --network <network-name>
+
+    curl -N http://localhost:8080/events
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import astuple, dataclass, field
+from typing import Any
+
+from eth_pydantic_types import HexBytes
+
+from scripts.decode import decode_song_bid, fetch_song_bid_logs
+from scripts.reads import MULTICALL3_ADDRESS, read_snapshot, round_as_dict, song_as_dict
+
+AUCTION_ADDRESS = "0x0d0902dc4970556e2BE2C97f507DFD14B15F51c0"
+HOST = "0.0.0.0"
+PORT = 8080
+POLL_INTERVAL = 1.0
+MAX_QUEUE = 256
+KEEPALIVE = 15.0
+MAX_BACKOFF = 30.0
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Event:
+    """
+    A feed event: `snapshot` (sent on connect and on resync), `bid` or
+    `round`. Events at or below a snapshot's block are already reflected
+    in that snapshot.
+    """
+
+    type: str
+    block_number: int
+    data: dict[str, Any] = field(default_factory=dict)
+
+    def encode(self):
+        """
+        Encodes the event as a Server-Sent Events message.
+        """
+        return (
+            f"event: {self.type}\nid: {self.block_number}\ndata: {json.dumps(self.data)}\n\n"
+        ).encode()
+
+
+class Subscriber:
+    """
+    A bounded queue of events for one client.
+    """
+
+    def __init__(self, maxsize=MAX_QUEUE):
+        self._queue: asyncio.Queue[Event] = asyncio.Queue(maxsize)
+        self._synced_block = -1
+        self.resyncs = 0
+
+    def offer(self, event):
+        """
+        Queues `event` without blocking. Returns `False` if the queue is
+        full and the subscriber must be resynced.
+        """
+        if event.block_number <= self._synced_block:
+            return True
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def resync(self, snapshot):
+        """
+        Drops the backlog and replaces it with `snapshot`. Later events
+        already covered by the snapshot are skipped.
+        """
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(snapshot)
+        self._synced_block = snapshot.block_number
+        self.resyncs += 1
+
+    async def get(self):
+        return await self._queue.get()
+
+    def qsize(self):
+        return self._queue.qsize()
+
+
+class AuctionFeed:
+    """
+    Follows the chain for `auction` and publishes its events to all
+    subscribers.
+    """
+
+    def __init__(
+        self, auction, multicall_address=MULTICALL3_ADDRESS, max_queue=MAX_QUEUE
+    ):
+        self.auction = auction
+        self.multicall_address = multicall_address
+        self.max_queue = max_queue
+        self.snapshot = None
+        self._subscribers: set[Subscriber] = set()
+
+    @property
+    def subscribers(self):
+        return len(self._subscribers)
+
+    def snapshot_event(self):
+        return Event("snapshot", self.snapshot.block_number, self.snapshot.as_dict())
+
+    def subscribe(self):
+        """
+        Registers a new subscriber, primed with the cached snapshot so
+        connecting costs no upstream request.
+        """
+        if self.snapshot is None:
+            raise RuntimeError("feed: no snapshot yet, call `poll` first")
+        subscriber = Subscriber(self.max_queue)
+        subscriber.offer(self.snapshot_event())
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self._subscribers.discard(subscriber)
+
+    def publish(self, event):
+        for subscriber in self._subscribers:
+            if not subscriber.offer(event):
+                subscriber.resync(self.snapshot_event())
+
+    def _read(self):
+        """
+        Reads everything new since the last snapshot. Runs in a worker
+        thread since ape's provider calls are blocking.
+        """
+        from ape import chain
+
+        head = chain.blocks.head
+        previous = self.snapshot
+        if previous is not None and head.number <= previous.block_number:
+            return previous, []
+
+        snapshot = read_snapshot(
+            self.auction, block=head, multicall_address=self.multicall_address
+        )
+        if previous is None:
+            # History before the feed started is not replayed.
+            return snapshot, []
+
+        bids = [
+            (decode_song_bid(log), log["transactionHash"])
+            for log in fetch_song_bid_logs(
+                self.auction, previous.block_number + 1, head.number + 1
+            )
+        ]
+
+        # Each round rolled within the window gets its own transition,
+        # placed between the bids of the previous round and its own.
+        events = []
+        low = previous.block_number + 1
+        for round_id in range(previous.round.id, snapshot.round.id + 1):
+            if round_id > previous.round.id:
+                # The roll is no later than the first bid of the round.
+                high = next(
+                    (bid.block_number for bid, _ in bids if bid.round_id >= round_id),
+                    head.number,
+                )
+                start_time = self._start_time(round_id, snapshot, head.number)
+                roll = self._roll_block(start_time, low, high)
+                events.append(self._round_event(round_id, roll, snapshot))
+                low = roll
+            for bid, txn_hash in bids:
+                if bid.round_id == round_id:
+                    events.append(_bid_event(bid, txn_hash))
+                    low = bid.block_number
+        return snapshot, events
+
+    def _start_time(self, round_id, snapshot, block_id):
+        if round_id == snapshot.round.id:
+            return snapshot.round.start_time
+        return self.auction.get_round_start_time(round_id, block_id=block_id)
+
+    def _round_event(self, round_id, block_number, snapshot):
+        """
+        Returns the transition to `round_id`, with the state as of the
+        block that rolled it.
+        """
+        from ape import chain
+
+        if block_number != snapshot.block_number:
+            snapshot = read_snapshot(
+                self.auction,
+                block=chain.blocks[block_number],
+                multicall_address=self.multicall_address,
+            )
+        return Event(
+            "round",
+            block_number,
+            {
+                "previous_round_id": round_id - 1,
+                "round": round_as_dict(snapshot.round),
+                "last_winning_round": round_as_dict(snapshot.last_winning_round),
+            },
+        )
+
+    def _roll_block(self, start_time, low, high):
+        """
+        Returns the block in `[low, high]` that started the round, i.e. the
+        first one whose timestamp reaches `start_time`. Only the headers
+        bisected are fetched.
+        """
+        from ape import chain
+
+        while low < high:
+            middle = (low + high) // 2
+            if chain.blocks[middle].timestamp >= start_time:
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    async def poll(self):
+        """
+        Reads the chain once and publishes any new events. Returns the
+        published events.
+        """
+        snapshot, events = await asyncio.to_thread(self._read)
+        self.snapshot = snapshot
+        for event in events:
+            self.publish(event)
+        return events
+
+    async def run(self, interval=POLL_INTERVAL, max_backoff=MAX_BACKOFF):
+        """
+        Polls forever. A failed poll is logged and retried with a growing
+        delay; the snapshot is left as it was, so the next successful poll
+        covers the missed blocks and subscribers stay connected.
+        """
+        delay = interval
+        while True:
+            try:
+                await self.poll()
+            except Exception:
+                delay = min(delay * 2, max_backoff)
+                logger.exception("feed: poll failed, retrying in %.1fs", delay)
+            else:
+                delay = interval
+            await asyncio.sleep(delay)
+
+
+def _bid_event(bid, txn_hash):
+    return Event(
+        "bid",
+        bid.block_number,
+        {
+            "round_id": bid.round_id,
+            "sender": bid.sender,
+            "amount": str(bid.amount),
+            "song": song_as_dict(astuple(bid.song)),
+            "transaction_hash": HexBytes(txn_hash).to_0x_hex(),
+        },
+    )
+
+
+def create_app(feed):
+    """
+    Creates the aiohttp application serving `feed` on `GET /events`.
+    """
+    # perf: aiohttp is only needed when actually serving.
+    from aiohttp import web
+
+    async def events(request):
+        subscriber = feed.subscribe()
+        response = web.StreamResponse(
+            headers={
+                "Content-Type": "text/event-stream",
+                "Cache-Control": "no-cache",
+                "Access-Control-Allow-Origin": "*",
+            }
+        )
+        await response.prepare(request)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.get(), KEEPALIVE)
+                except asyncio.TimeoutError:
+                    await response.write(b": keepalive\n\n")
+                    continue
+                await response.write(event.encode())
+        finally:
+            feed.unsubscribe(subscriber)
+        return response
+
+    app = web.Application()
+    app.router.add_get("/events", events)
+    return app
+
+
+async def serve(feed, host=HOST, port=PORT, interval=POLL_INTERVAL):
+    from aiohttp import web
+
+    await feed.poll()
+    runner = web.AppRunner(create_app(feed))
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    try:
+        await feed.run(interval)
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    from scripts.artifacts import container
+
+    feed = AuctionFeed(container("auction").at(AUCTION_ADDRESS))
+    asyncio.run(serve(feed))
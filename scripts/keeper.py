@@ -0,0 +1,216 @@
+"""
+Keeper that rolls the auction with `end_round_and_start_new_round`.
+
+A new round starts at the timestamp of the block that rolls the previous
+one, so every late roll shifts the whole schedule. The keeper sleeps
+until the current round's `end_time`, simulates the roll against the
+pending block until it would succeed, submits it with fees under our
+control and replaces it if it gets stuck. If someone else rolls first,
+the keeper backs off (cancelling its own transaction if it is still
+pending) instead of paying for a revert.
+
+Usage:
+    ape run keeper --network <network-name>
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from scripts.transactions import FeePolicy, base_fee, broadcast, cancel, get_receipt
+
+AUCTION_ADDRESS = "0x0d0902dc4970556e2BE2C97f507DFD14B15F51c0"
+KEEPER_ACCOUNT = "songcoin"
+PRIORITY_FEE = 10_000_000  # 0.01 gwei
+MAX_FEE_CAP = 1_000_000_000  # 1 gwei
+POLL_INTERVAL = 1.0
+REPLACE_AFTER = 6.0
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RollResult:
+    """
+    Outcome of one round boundary. `lag` is how many seconds after
+    `end_time` the next round started, whoever rolled it.
+    """
+
+    round_id: int
+    end_time: int
+    lag: int
+    rolled_by_us: bool
+    txn_hash: str | None = None
+    replacements: int = 0
+    cancelled: bool = False
+
+
+class Keeper:
+    """
+    Rolls `auction` from `account` at every round boundary. `clock` and
+    `sleep` are injectable so the keeper can be driven by chain time.
+    """
+
+    def __init__(
+        self,
+        auction,
+        account,
+        fee_policy,
+        clock=time.time,
+        sleep=asyncio.sleep,
+        poll_interval=POLL_INTERVAL,
+        replace_after=REPLACE_AFTER,
+    ):
+        self.auction = auction
+        self.account = account
+        self.fee_policy = fee_policy
+        self.clock = clock
+        self.sleep = sleep
+        self.poll_interval = poll_interval
+        self.replace_after = replace_after
+
+    def _simulate(self):
+        """
+        Simulates the roll against the pending block. Returns `None` if it
+        would succeed, the revert message otherwise.
+        """
+        from ape.exceptions import ContractLogicError
+
+        try:
+            self.auction.end_round_and_start_new_round.call(
+                sender=self.account.address, block_id="pending"
+            )
+        except ContractLogicError as err:
+            return err.revert_message or str(err)
+        return None
+
+    def _rolled(self, round_id):
+        return self.auction.get_current_round_id() != round_id
+
+    def _result(self, round_id, end_time, **kwargs):
+        lag = self.auction.get_round_start_time(round_id + 1) - end_time
+        result = RollResult(round_id=round_id, end_time=end_time, lag=lag, **kwargs)
+        logger.info(
+            "round %d rolled %ds after end_time by %s",
+            round_id,
+            lag,
+            "us" if result.rolled_by_us else "someone else",
+        )
+        return result
+
+    async def roll_once(self):
+        """
+        Waits for the current round to end and rolls it.
+        """
+        round_id = self.auction.get_current_round_id()
+        end_time = self.auction.get_round_end_time(round_id)
+        delay = end_time - self.clock()
+        if delay > 0:
+            await self.sleep(delay)
+
+        while True:
+            # Wait for the first block in which the roll succeeds.
+            while (reason := self._simulate()) is not None:
+                if self._rolled(round_id):
+                    return self._result(round_id, end_time, rolled_by_us=False)
+                logger.debug("roll of round %d not possible yet: %s", round_id, reason)
+                await self.sleep(self.poll_interval)
+
+            if (result := await self._submit(round_id, end_time)) is not None:
+                return result
+
+    async def _submit(self, round_id, end_time):
+        """
+        Sends the roll and sees it through. Returns `None` if it reverted
+        while the round is still open, so the caller can try again.
+        """
+        nonce = self.account.nonce
+        fees = self.fee_policy.initial(base_fee())
+        txn = self.auction.end_round_and_start_new_round.as_transaction(
+            sender=self.account, nonce=nonce, **fees.as_kwargs()
+        )
+        gas_limit = txn.gas_limit
+        hashes = [broadcast(self.account, txn)]
+        sent_at = self.clock()
+        replacements = 0
+        cancelled = False
+
+        while True:
+            # Read the round before the receipts: if our own roll lands in
+            # between, its receipt is found rather than cancelling it.
+            rolled = self._rolled(round_id)
+
+            # Any of the transactions sharing our nonce may be the one mined.
+            for txn_hash in hashes:
+                if (receipt := get_receipt(txn_hash)) is not None:
+                    rolled_by_us = not cancelled and receipt["status"] == 1
+                    if not rolled_by_us and not self._rolled(round_id):
+                        logger.warning("roll of round %d reverted, retrying", round_id)
+                        return None
+                    return self._result(
+                        round_id,
+                        end_time,
+                        rolled_by_us=rolled_by_us,
+                        txn_hash=txn_hash,
+                        replacements=replacements,
+                        cancelled=cancelled,
+                    )
+
+            if not cancelled and rolled:
+                # Someone else rolled first, our roll would only revert.
+                if (bumped := self.fee_policy.bump(fees)) is not None:
+                    fees = bumped
+                    hashes.append(cancel(self.account, nonce, fees))
+                    cancelled = True
+                    logger.info("round %d rolled by someone else, cancelling", round_id)
+
+            elif not cancelled and self.clock() - sent_at >= self.replace_after:
+                if (bumped := self.fee_policy.bump(fees)) is None:
+                    logger.warning(
+                        "roll of round %d stuck at the max fee cap", round_id
+                    )
+                else:
+                    fees = bumped
+                    txn = self.auction.end_round_and_start_new_round.as_transaction(
+                        sender=self.account,
+                        nonce=nonce,
+                        gas_limit=gas_limit,
+                        **fees.as_kwargs(),
+                    )
+                    hashes.append(broadcast(self.account, txn))
+                    replacements += 1
+                    logger.info(
+                        "roll of round %d stuck, replaced (%d)", round_id, replacements
+                    )
+                sent_at = self.clock()
+
+            await self.sleep(self.poll_interval)
+
+    async def run(self):
+        """
+        Rolls every round. A round that fails, e.g. on an RPC error or a
+        rejected broadcast, is logged and retried after `poll_interval`.
+        """
+        while True:
+            try:
+                await self.roll_once()
+            except Exception:
+                logger.exception("roll failed, retrying")
+                await self.sleep(self.poll_interval)
+
+
+def main():
+    from ape import accounts
+
+    from scripts.artifacts import container
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    account = accounts.load(KEEPER_ACCOUNT)
+    account.set_autosign(True)
+    keeper = Keeper(
+        container("auction").at(AUCTION_ADDRESS),
+        account,
+        FeePolicy(priority_fee=PRIORITY_FEE, max_fee_cap=MAX_FEE_CAP),
+    )
+    asyncio.run(keeper.run())
@@ -0,0 +1,388 @@
+"""
+Prometheus exporter for on-chain auction health.
+
+The exporter checks the chain head every `POLL_INTERVAL` seconds and does
+the real work once per new block: one batched snapshot read, one
+`eth_getLogs` for `SongBid`, one full block fetch and, for blocks with
+auction transactions, one `eth_getBlockReceipts`. Nodes without
+`eth_getBlockReceipts` fall back to a receipt fetch per auction
+transaction. A poll that fails, e.g. on an RPC error, is logged and
+counted in `songcoin_auction_poll_errors_total`, and the next poll picks up
+from the last good one. Metrics are served in the Prometheus text format on
+`GET /metrics`.
+
+Usage:
+    ape run metrics --network <network-name>
+
+    curl http://localhost:9464/metrics
+"""
+
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scripts.reads import MULTICALL3_ADDRESS, read_snapshot
+
+AUCTION_ADDRESS = "0x0d0902dc4970556e2BE2C97f507DFD14B15F51c0"
+HOST = "0.0.0.0"
+PORT = 9464
+POLL_INTERVAL = 1.0
+
+GAS_BUCKETS = (50_000, 75_000, 100_000, 150_000, 200_000, 300_000, 500_000, 1_000_000)
+BIDS_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+LAG_BUCKETS = (1, 2, 5, 12, 30, 60, 120, 300, 900, 3600)
+
+logger = logging.getLogger(__name__)
+
+
+class Metric(ABC):
+    """
+    Base class for a single unlabelled metric.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+
+    @abstractmethod
+    def samples(self):
+        """
+        Yields the `(name, value)` pairs of the metric.
+        """
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(f"{name} {_format(value)}" for name, value in self.samples())
+        return "\n".join(lines)
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name, help):
+        super().__init__(name, help)
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def samples(self):
+        yield self.name, self.value
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name, help):
+        super().__init__(name, help)
+        self.value = 0
+
+    def inc(self, amount=1):
+        if amount < 0:
+            raise ValueError("metrics: counters can only increase")
+        self.value += amount
+
+    def samples(self):
+        yield f"{self.name}_total", self.value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, buckets):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+    def samples(self):
+        for bound, count in zip(self.buckets, self.counts):
+            yield f'{self.name}_bucket{{le="{_format(bound)}"}}', count
+        yield f'{self.name}_bucket{{le="+Inf"}}', self.count
+        yield f"{self.name}_sum", self.sum
+        yield f"{self.name}_count", self.count
+
+
+def _format(value):
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+class AuctionMetrics:
+    """
+    Tracks the health metrics of `auction` block by block.
+    """
+
+    def __init__(self, auction, multicall_address=MULTICALL3_ADDRESS):
+        self.auction = auction
+        self.multicall_address = multicall_address
+        self.snapshot = None
+        self._lock = threading.Lock()
+        self._selectors = None
+        self._block_receipts = True
+        # Bids seen in the current round, `None` until a round is watched
+        # from its start so that partial counts are never reported.
+        self._round_bids = None
+
+        self.block = Gauge(
+            "songcoin_auction_block", "Last block processed by the exporter"
+        )
+        self.round_id = Gauge("songcoin_auction_round_id", "Current round id")
+        self.seconds_until_end = Gauge(
+            "songcoin_auction_seconds_until_end",
+            "Seconds from the last block until the current round's end_time",
+        )
+        self.highest_bid = Gauge(
+            "songcoin_auction_highest_bid",
+            "Highest bid of the current round in SONG wei",
+        )
+        self.bids = Counter("songcoin_auction_bids", "SongBid events seen")
+        self.bids_per_round = Histogram(
+            "songcoin_auction_bids_per_round",
+            "Bids received by each rolled round",
+            BIDS_BUCKETS,
+        )
+        self.bid_gas = Histogram(
+            "songcoin_auction_bid_gas_used",
+            "Gas used by successful bid transactions",
+            GAS_BUCKETS,
+        )
+        self.roll_gas = Histogram(
+            "songcoin_auction_roll_gas_used",
+            "Gas used by successful end_round_and_start_new_round transactions",
+            GAS_BUCKETS,
+        )
+        self.reverted_gas = Counter(
+            "songcoin_auction_reverted_gas_used",
+            "Gas spent on auction transactions that reverted",
+        )
+        self.refunded = Counter(
+            "songcoin_auction_refunded", "SONG wei refunded to outbid bidders"
+        )
+        self.burned = Counter(
+            "songcoin_auction_burned", "SONG wei burned by rolled rounds"
+        )
+        self.last_round_burned = Gauge(
+            "songcoin_auction_last_round_burned",
+            "SONG wei burned by the last rolled round",
+        )
+        self.keeper_lag = Histogram(
+            "songcoin_auction_keeper_lag_seconds",
+            "Seconds past end_time before a round was rolled",
+            LAG_BUCKETS,
+        )
+        self.poll_errors = Counter(
+            "songcoin_auction_poll_errors",
+            "Polls of the chain that failed, e.g. on an RPC error",
+        )
+        self.last_keeper_lag = Gauge(
+            "songcoin_auction_last_keeper_lag_seconds",
+            "Seconds past end_time before the last round was rolled",
+        )
+
+    @property
+    def metrics(self):
+        return [value for value in vars(self).values() if isinstance(value, Metric)]
+
+    def render(self):
+        with self._lock:
+            return "\n".join(metric.render() for metric in self.metrics) + "\n"
+
+    def _method_selectors(self):
+        if self._selectors is None:
+            from ape import chain
+
+            ecosystem = chain.provider.network.ecosystem
+            self._selectors = {
+                bytes(
+                    ecosystem.get_method_selector(self.auction.bid.abis[0])
+                ): self.bid_gas,
+                bytes(
+                    ecosystem.get_method_selector(
+                        self.auction.end_round_and_start_new_round.abis[0]
+                    )
+                ): self.roll_gas,
+            }
+        return self._selectors
+
+    def poll(self):
+        """
+        Processes every block since the last poll. Returns `True` if there
+        was a new block.
+        """
+        from ape import chain
+
+        head = chain.blocks.head
+        previous = self.snapshot
+        if previous is not None and head.number <= previous.block_number:
+            return False
+
+        snapshot = read_snapshot(
+            self.auction, block=head, multicall_address=self.multicall_address
+        )
+        # Everything is read before any metric changes, so a poll that
+        # fails midway leaves no partial counts for the next one to repeat.
+        blocks = None if previous is None else self._read_blocks(previous, snapshot)
+        with self._lock:
+            if blocks is not None:
+                self._observe_blocks(previous, snapshot, *blocks)
+            self._observe_snapshot(snapshot)
+            self.snapshot = snapshot
+        return True
+
+    def _observe_snapshot(self, snapshot):
+        self.block.set(snapshot.block_number)
+        self.round_id.set(snapshot.round.id)
+        self.seconds_until_end.set(snapshot.round.end_time - snapshot.timestamp)
+        self.highest_bid.set(snapshot.round.highest_bid)
+
+    def _read_blocks(self, previous, snapshot):
+        """
+        Returns the `SongBid` logs since `previous` and the histogram and
+        receipt of each auction transaction mined since.
+        """
+        from ape import chain
+
+        logs = list(
+            self.auction.SongBid.range(
+                previous.block_number + 1, snapshot.block_number + 1
+            )
+        )
+        selectors = self._method_selectors()
+        gas = []
+        for number in range(previous.block_number + 1, snapshot.block_number + 1):
+            calls = [
+                (bytes(txn.txn_hash), histogram)
+                for txn in chain.provider.get_transactions_by_block(number)
+                if txn.receiver == self.auction.address
+                and (histogram := selectors.get(bytes(txn.data[:4])))
+            ]
+            if not calls:
+                continue
+            receipts = self._receipts(number, [txn_hash for txn_hash, _ in calls])
+            gas.extend((histogram, receipts[txn_hash]) for txn_hash, histogram in calls)
+        return logs, gas
+
+    def _observe_blocks(self, previous, snapshot, logs, gas):
+        # Refunds: every bid returns the previous highest bid of its round.
+        round_id, highest = previous.round.id, previous.round.highest_bid
+        for log in logs:
+            if log.round_id != round_id:
+                self._close_round()
+                round_id, highest = log.round_id, 0
+            self.refunded.inc(highest)
+            highest = log.amount
+            self.bids.inc()
+            if self._round_bids is not None:
+                self._round_bids += 1
+
+        if snapshot.round.id != previous.round.id:
+            if round_id == previous.round.id:
+                # Rolled with no bids in the new round yet.
+                self._close_round()
+            # Only the last roll is visible if several happened since the
+            # previous poll.
+            ended = snapshot.last_winning_round
+            self.burned.inc(ended.highest_bid)
+            self.last_round_burned.set(ended.highest_bid)
+            lag = snapshot.round.start_time - ended.end_time
+            self.keeper_lag.observe(lag)
+            self.last_keeper_lag.set(lag)
+
+        for histogram, receipt in gas:
+            if receipt["status"] == 0:
+                self.reverted_gas.inc(receipt["gasUsed"])
+            else:
+                histogram.observe(receipt["gasUsed"])
+
+    def _receipts(self, number, hashes):
+        """
+        Returns the receipts of block `number`, keyed by transaction hash,
+        with a single `eth_getBlockReceipts` when the node supports it.
+        Otherwise only the receipts of `hashes` are fetched, one by one.
+        """
+        from ape import chain
+        from web3.exceptions import MethodUnavailable
+
+        web3 = chain.provider.web3
+        if self._block_receipts:
+            try:
+                receipts = web3.eth.get_block_receipts(number)
+            except MethodUnavailable:
+                self._block_receipts = False
+            else:
+                return {
+                    bytes(receipt["transactionHash"]): receipt for receipt in receipts
+                }
+        return {
+            txn_hash: web3.eth.get_transaction_receipt(txn_hash) for txn_hash in hashes
+        }
+
+    def _close_round(self):
+        if self._round_bids is not None:
+            self.bids_per_round.observe(self._round_bids)
+        # The next round is watched from its start.
+        self._round_bids = 0
+
+
+def serve(exporter, host=HOST, port=PORT):
+    """
+    Starts serving `exporter` on `GET /metrics` from a background thread.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = exporter.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(exporter, interval=POLL_INTERVAL, sleep=time.sleep):
+    """
+    Polls `exporter` forever. A failed poll is logged and counted in
+    `poll_errors`, and the blocks it missed are covered by the next one.
+    """
+    while True:
+        try:
+            exporter.poll()
+        except Exception:
+            exporter.poll_errors.inc()
+            logger.exception("metrics: poll failed")
+        sleep(interval)
+
+
+def main():
+    from scripts.artifacts import container
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    exporter = AuctionMetrics(container("auction").at(AUCTION_ADDRESS))
+    serve(exporter)
+    run(exporter)
@@ -0,0 +1,167 @@
+"""
+Batched reads of auction state.
+
+All reads go through Multicall3 so that a whole snapshot of the auction
+costs a single `eth_call`, pinned to one block, no matter how many
+getters it combines.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+from eth_pydantic_types import HexBytes
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+# Every instance costs a name and a full `Round` with its strings, so a
+# whole 1024-instance registry in one call could exceed a node's
+# `eth_call` gas cap.
+AUCTIONS_PER_CALL = 100
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    The state of an auction as of `block_number`.
+    """
+
+    block_number: int
+    timestamp: int
+    round: Any
+    last_winning_round: Any
+
+    def as_dict(self):
+        return {
+            "block_number": self.block_number,
+            "timestamp": self.timestamp,
+            "round": round_as_dict(self.round),
+            "last_winning_round": round_as_dict(self.last_winning_round),
+        }
+
+
+def song_as_dict(song):
+    """
+    Converts a decoded `Song` struct, or the plain tuple event logs carry,
+    into JSON-serializable values.
+    """
+    return {
+        "title": song[0],
+        "artist": song[1],
+        "iframe_hash": HexBytes(song[2]).to_0x_hex(),
+        "iframe_url": song[3],
+    }
+
+
+def round_as_dict(round):
+    """
+    Converts a decoded `Round` struct into JSON-serializable values.
+    Token amounts are strings since they do not fit in a JS number.
+    """
+    return {
+        "id": round.id,
+        "highest_bidder": round.highest_bidder,
+        "highest_bid": str(round.highest_bid),
+        "ended": round.ended,
+        "start_time": round.start_time,
+        "end_time": round.end_time,
+        "song": song_as_dict(round.song),
+    }
+
+
+@dataclass(frozen=True)
+class AuctionState:
+    """
+    The current round of one auction instance of a factory.
+    """
+
+    address: str
+    name: str
+    round: Any
+
+
+def batched_call(calls, block_id=None, multicall_address=MULTICALL3_ADDRESS):
+    """
+    Performs `calls`, a sequence of `(method, *args)` tuples, in a single
+    `eth_call` through Multicall3 and returns their decoded results in
+    order. Any failing call reverts the whole batch.
+    """
+    # perf: defer ape imports until a read is actually made.
+    from ape import chain
+    from ape_ethereum import multicall
+
+    # A non-canonical address is a Multicall3 we deployed ourselves
+    # (e.g. on a local chain), so allow it on the current chain.
+    supported_chains = (
+        None if multicall_address == MULTICALL3_ADDRESS else [chain.chain_id]
+    )
+    call = multicall.Call(address=multicall_address, supported_chains=supported_chains)
+    for method, *args in calls:
+        call.add(method, *args, allowFailure=False)
+
+    kwargs = {} if block_id is None else {"block_id": block_id}
+    return list(call(**kwargs))
+
+
+def read_snapshot(auction, block=None, multicall_address=MULTICALL3_ADDRESS):
+    """
+    Reads a `Snapshot` of `auction` at `block` (the chain head by default)
+    with one batched call.
+    """
+    from ape import chain
+
+    if block is None:
+        block = chain.blocks.head
+
+    current_round, last_winning_round = batched_call(
+        [(auction.get_current_round,), (auction.last_winning_round,)],
+        block_id=block.number,
+        multicall_address=multicall_address,
+    )
+    return Snapshot(
+        block_number=block.number,
+        timestamp=block.timestamp,
+        round=current_round,
+        last_winning_round=last_winning_round,
+    )
+
+
+def read_auctions(
+    factory,
+    contract_type,
+    auctions=None,
+    block_id=None,
+    multicall_address=MULTICALL3_ADDRESS,
+    batch=AUCTIONS_PER_CALL,
+):
+    """
+    Reads the name and current round of every auction instance of
+    `factory`, with one batched call per `batch` instances. `contract_type`
+    is the `auction` contract type. The registry is listed first with
+    `get_auctions`, unless `auctions` (e.g. from a previous read) is given.
+    All the reads are pinned to `block_id`, the chain head by default.
+    """
+    from ape import chain
+    from ape.contracts import ContractInstance
+
+    if block_id is None:
+        block_id = chain.blocks.head.number
+    if auctions is None:
+        auctions = factory.get_auctions(block_id=block_id)
+
+    # Binding the contract type directly avoids a code fetch per instance.
+    instances = [ContractInstance(address, contract_type) for address in auctions]
+    states = []
+    for start in range(0, len(instances), batch):
+        chunk = instances[start : start + batch]
+        calls = []
+        for instance in chunk:
+            calls.append((factory.auction_names, instance.address))
+            calls.append((instance.get_current_round,))
+
+        results = batched_call(
+            calls, block_id=block_id, multicall_address=multicall_address
+        )
+        states.extend(
+            AuctionState(address=instance.address, name=name, round=round)
+            for instance, name, round in zip(chunk, results[::2], results[1::2])
+        )
+    return states
@@ -1,5 +1,4 @@
-from ape import accounts, project
-from eth_pydantic_types import HexBytes
+from scripts.artifacts import container, run_standalone
 
 
 AUCTION_ADDRESS = "0x0d0902dc4970556e2BE2C97f507DFD14B15F51c0"
@@ -8,9 +7,14 @@ TEST_WALLETS = []
 
 
 def main():
+    # perf: importing `accounts` starts ape's managers, keep it and the
+    # pydantic types out of module import.
+    from ape import accounts
+    from eth_pydantic_types import HexBytes
+
     # Get the latest deployments
-    songcoin = project.mock_erc20.at(SONGCOIN_ADDRESS)
-    auction = project.auction.at(AUCTION_ADDRESS)
+    songcoin = container("mock_erc20").at(SONGCOIN_ADDRESS)
+    auction = container("auction").at(AUCTION_ADDRESS)
 
     # Get the deployer account
     deployer = accounts.load("songcoin")
@@ -81,3 +85,7 @@ def main():
         print(
             f"Successfully created bid of {bid_amount} tokens for song: {song['title']} by {song['artist']} by bidder {i + 1}"
         )
+
+
+if __name__ == "__main__":
+    run_standalone(main)
@@ -0,0 +1,147 @@
+"""
+Helpers for sending transactions without blocking on their receipts.
+
+Calling a contract method with `sender=` makes ape wait for the receipt,
+which rules out replacing a transaction that is stuck in the mempool.
+These helpers sign and broadcast raw transactions instead, leaving
+nonces, fees and replacement to the caller.
+"""
+
+from dataclasses import dataclass
+
+# Nodes reject a replacement unless both fees rise by at least 10%.
+MIN_BUMP_PERCENT = 10
+CANCEL_GAS_LIMIT = 21_000
+
+
+@dataclass(frozen=True)
+class Fees:
+    """
+    EIP-1559 fee parameters of a transaction, in wei per gas.
+    """
+
+    max_fee: int
+    max_priority_fee: int
+
+    def as_kwargs(self):
+        return {"max_fee": self.max_fee, "max_priority_fee": self.max_priority_fee}
+
+
+@dataclass(frozen=True)
+class FeePolicy:
+    """
+    How much we are willing to pay: the initial tip, a hard cap on the
+    max fee and the percentage by which each replacement bumps both fees.
+    """
+
+    priority_fee: int
+    max_fee_cap: int
+    base_fee_multiplier: int = 2
+    bump_percent: int = 15
+
+    def __post_init__(self):
+        if self.bump_percent < MIN_BUMP_PERCENT:
+            raise ValueError(
+                f"transactions: bumps below {MIN_BUMP_PERCENT}% are not relayed"
+            )
+        if self.priority_fee > self.max_fee_cap:
+            raise ValueError("transactions: priority fee is above the max fee cap")
+
+    def initial(self, base_fee):
+        """
+        Fees for a first submission on top of `base_fee`.
+        """
+        max_fee = min(
+            base_fee * self.base_fee_multiplier + self.priority_fee, self.max_fee_cap
+        )
+        return Fees(max_fee=max_fee, max_priority_fee=self.priority_fee)
+
+    def bump(self, fees):
+        """
+        Fees for a replacement of a transaction sent with `fees`, or
+        `None` if that would exceed the cap.
+        """
+        max_fee = _bumped(fees.max_fee, self.bump_percent)
+        if max_fee > self.max_fee_cap:
+            return None
+        return Fees(
+            max_fee=max_fee,
+            max_priority_fee=min(
+                _bumped(fees.max_priority_fee, self.bump_percent), max_fee
+            ),
+        )
+
+
+def _bumped(value, percent):
+    # Round up so a bump is never lost to integer division.
+    return -(-value * (100 + percent) // 100)
+
+
+def base_fee():
+    """
+    Base fee of the pending block, estimated from the chain head.
+    """
+    from ape import chain
+
+    return chain.blocks.head.base_fee or 0
+
+
+def broadcast(account, txn):
+    """
+    Signs `txn` with `account` and broadcasts it without waiting for a
+    receipt. Returns the transaction hash.
+    """
+    from ape import chain
+
+    signed = account.sign_transaction(txn)
+    return chain.provider.web3.eth.send_raw_transaction(
+        signed.serialize_transaction()
+    ).to_0x_hex()
+
+
+def get_receipt(txn_hash):
+    """
+    Returns the raw receipt of `txn_hash`, or `None` while it is pending.
+    """
+    from ape import chain
+    from web3.exceptions import TransactionNotFound
+
+    try:
+        return chain.provider.web3.eth.get_transaction_receipt(txn_hash)
+    except TransactionNotFound:
+        return None
+
+
+def cancel_transaction(account, nonce, fees):
+    """
+    An empty transfer from `account` to itself with `nonce`, which
+    replaces whatever was pending with that nonce.
+    """
+    from ape import chain
+
+    return chain.provider.network.ecosystem.create_transaction(
+        chain_id=chain.chain_id,
+        sender=account.address,
+        receiver=account.address,
+        value=0,
+        nonce=nonce,
+        gas_limit=CANCEL_GAS_LIMIT,
+        type=2,
+        **fees.as_kwargs(),
+    )
+
+
+def cancel(account, nonce, fees):
+    """
+    Replaces whatever `account` sent with `nonce` by an empty transfer to
+    itself, so a pending transaction that would revert costs 21k gas
+    instead. Returns the hash of the cancelling transaction.
+    """
+    return broadcast(account, cancel_transaction(account, nonce, fees))
+
+
+def gas_cost(receipt):
+    """
+    Wei paid for the gas of a mined transaction.
+    """
+    return receipt["gasUsed"] * receipt["effectiveGasPrice"]
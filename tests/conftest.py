@@ -64,3 +64,46 @@ def auction(project, deployer, mock_erc20):
         mock_erc20.address, round_duration, sender=deployer
     )
     return auction
+
+
+@pytest.fixture(scope="module")
+def auction_factory(project, deployer, mock_erc20):
+    blueprint = deployer.declare(project.auction).contract_address
+    auction_factory = project.auction_factory.deploy(
+        blueprint, mock_erc20.address, sender=deployer
+    )
+    return auction_factory
+
+
+@pytest.fixture(scope="module")
+def multicall_address(chain, deployer):
+    # The local provider cannot `set_code` at the canonical Multicall3
+    # address, so deploy its runtime code behind a minimal constructor
+    # (CODECOPY the runtime and RETURN it) instead.
+    from ape_ethereum.multicall.constants import (
+        MULTICALL3_CODE,
+        MULTICALL3_CONTRACT_TYPE,
+    )
+    from eth_pydantic_types import HexBytes
+    from ethpm_types import ContractType
+
+    runtime = HexBytes(MULTICALL3_CODE)
+    size = len(runtime).to_bytes(2, "big")
+    constructor = b"\x61" + size + b"\x80\x60\x0c\x60\x00\x39\x60\x00\xf3"
+    txn = chain.provider.network.ecosystem.create_transaction(
+        data=constructor + runtime
+    )
+    address = deployer.call(txn).contract_address
+    chain.contracts.cache_contract_type(
+        address, ContractType.model_validate(MULTICALL3_CONTRACT_TYPE)
+    )
+    return address
+
+
+@pytest.fixture
+def manual_mining(chain):
+    # The local provider's `chain.mine()` skips the pending pool, so mine
+    # through eth-tester itself.
+    chain.provider.auto_mine = False
+    yield chain.provider.tester.ethereum_tester.mine_blocks
+    chain.provider.auto_mine = True
@@ -0,0 +1,158 @@
+import numpy as np
+import pytest
+
+from scripts.analytics import (
+    BidHistory,
+    RoundHistory,
+    bid_curves,
+    bidder_aggregates,
+    burned_supply,
+    increment_stats,
+    load_history,
+    song_aggregates,
+    time_to_final_bid,
+)
+
+ALICE = "0x00000000000000000000000000000000000A11CE"
+BOB = "0x0000000000000000000000000000000000000B0B"
+SONG_A = "https://open.spotify.com/embed/track/a"
+SONG_B = "https://open.spotify.com/embed/track/b"
+
+
+@pytest.fixture
+def history():
+    # Round 0: alice 100 @10, bob 150 @40, alice 300 @55 (ended)
+    # Round 1: bob 200 @70 (ended)
+    # Round 2: alice 50 @130 (in progress)
+    bids = BidHistory.from_columns(
+        round_id=[0, 0, 0, 1, 2],
+        timestamp=[10, 40, 55, 70, 130],
+        amount=[100, 150, 300, 200, 50],
+        bidder=[ALICE, BOB, ALICE, BOB, ALICE],
+        song=[SONG_A, SONG_B, SONG_A, SONG_B, SONG_A],
+    )
+    rounds = RoundHistory.from_columns(
+        id=[0, 1, 2],
+        start_time=[0, 62, 125],
+        end_time=[60, 122, 185],
+        highest_bid=[300, 200, 50],
+        ended=[True, True, False],
+    )
+    return bids, rounds
+
+
+def test_bid_curves(history):
+    bids, rounds = history
+    curves = bid_curves(bids, rounds)
+    assert curves.round_id.tolist() == [0, 1, 2]
+    assert curves.offsets.tolist() == [0, 3, 4, 5]
+    elapsed, amount = curves.curve(0)
+    assert elapsed.tolist() == [10, 40, 55]
+    assert amount.tolist() == [100, 150, 300]
+    assert curves.progress[3] == pytest.approx(8 / 60)
+
+
+def test_time_to_final_bid(history):
+    bids, rounds = history
+    round_id, since_start, before_end = time_to_final_bid(bids, rounds)
+    assert round_id.tolist() == [0, 1, 2]
+    assert since_start.tolist() == [55, 8, 5]
+    assert before_end.tolist() == [5, 52, 55]
+
+
+def test_increment_stats(history):
+    bids, _ = history
+    stats = increment_stats(bids)
+    # Only round 0 has consecutive bids: +50 and +150
+    assert stats.count == 2
+    assert stats.mean == 100
+    assert stats.max == 150
+    assert stats.mean_ratio == pytest.approx((50 / 100 + 150 / 150) / 2)
+
+
+def test_increment_stats_without_increments():
+    bids = BidHistory.from_columns([0], [1], [100], [ALICE], [SONG_A])
+    assert increment_stats(bids).count == 0
+
+
+def test_burned_supply(history):
+    _, rounds = history
+    burned_at, burned = burned_supply(rounds)
+    # Burns happen when the next round starts
+    assert burned_at.tolist() == [62, 125]
+    assert burned.tolist() == [300, 500]
+
+
+def test_song_aggregates(history):
+    bids, rounds = history
+    songs = song_aggregates(bids, rounds)
+    assert songs.keys.tolist() == [SONG_A, SONG_B]
+    assert songs.bids.tolist() == [3, 2]
+    assert songs.volume.tolist() == [450, 350]
+    assert songs.max_bid.tolist() == [300, 200]
+    # Round 2 has not ended yet, so it is not a win
+    assert songs.wins.tolist() == [1, 1]
+
+
+def test_bidder_aggregates(history):
+    bids, rounds = history
+    bidders = bidder_aggregates(bids, rounds)
+    alice, bob = (bidders.keys.tolist().index(a) for a in (ALICE, BOB))
+    assert bidders.bids[alice] == 3
+    assert bidders.wins[alice] == 1
+    assert bidders.won_volume[alice] == 300
+    assert bidders.won_volume[bob] == 200
+    assert bidders.max_bid[bob] == 200
+
+
+def test_bids_for_unknown_round(history):
+    bids, _ = history
+    rounds = RoundHistory.from_columns([0], [0], [60], [300], [True])
+    with pytest.raises(ValueError):
+        time_to_final_bid(bids, rounds)
+
+
+def test_load_history(
+    chain,
+    auction,
+    mock_erc20,
+    deployer,
+    bidder1,
+    bidder2,
+    song,
+    song2,
+    multicall_address,
+):
+    mock_erc20.mint(bidder1, 100_0000, sender=deployer)
+    mock_erc20.mint(bidder2, 100_0000, sender=deployer)
+    mock_erc20.approve(auction.address, 1000, sender=bidder1)
+    mock_erc20.approve(auction.address, 1000, sender=bidder2)
+    start_block = chain.blocks.height
+
+    round_id = auction.get_current_round_id()
+    receipts = [
+        auction.bid(100, song, sender=bidder1),
+        auction.bid(200, song2, sender=bidder2),
+    ]
+    chain.pending_timestamp += auction.get_round_duration()
+    chain.mine()
+    auction.end_round_and_start_new_round(sender=deployer)
+    receipts.append(auction.bid(300, song, sender=bidder1))
+
+    bids, rounds = load_history(
+        auction, start_block=start_block, multicall_address=multicall_address
+    )
+    assert bids.round_id.tolist() == [round_id, round_id, round_id + 1]
+    assert bids.amount.tolist() == [100, 200, 300]
+    assert bids.bidders[bids.bidder].tolist() == [bidder1, bidder2, bidder1]
+    assert bids.timestamp.tolist() == [r.timestamp for r in receipts]
+    assert rounds.id[-1] == round_id + 1
+    assert rounds.ended[round_id]
+    assert not rounds.ended[-1]
+
+    bidders = bidder_aggregates(bids, rounds)
+    assert bidders.won_volume[bidders.keys.tolist().index(bidder2)] == 200
+
+    # By default, logs are read from the auction's deployment block.
+    default, _ = load_history(auction, multicall_address=multicall_address)
+    assert default.amount.tolist() == bids.amount.tolist()
@@ -0,0 +1,109 @@
+import pytest
+
+from scripts.artifacts import (
+    artifact_path,
+    container,
+    load_contract_type,
+    run_standalone,
+    source_hash,
+)
+
+
+@pytest.fixture
+def root(tmp_path):
+    (tmp_path / "contracts").mkdir()
+    (tmp_path / "contracts" / "auction.vy").write_text("# pragma version ~=0.4.1\n")
+    (tmp_path / "ape-config.yaml").write_text("name: songcoin\n")
+    return tmp_path
+
+
+@pytest.fixture
+def compiled(project):
+    calls = []
+
+    def compile(name):
+        calls.append(name)
+        return getattr(project, name).contract_type
+
+    compile.calls = calls
+    return compile
+
+
+def test_source_hash_tracks_inputs(root):
+    digest = source_hash(root)
+    assert source_hash(root) == digest
+
+    (root / "contracts" / "auction.vy").write_text("# pragma version ~=0.4.3\n")
+    assert source_hash(root) != digest
+
+    digest = source_hash(root)
+    (root / "ape-config.yaml").write_text("name: songcoin\nplugins: []\n")
+    assert source_hash(root) != digest
+
+    digest = source_hash(root)
+    (root / "README.md").write_text("not a compilation input\n")
+    assert source_hash(root) == digest
+
+
+def test_cache_miss_then_hit(root, compiled, project):
+    path = artifact_path("auction", root)
+    assert not path.exists()
+
+    contract_type = load_contract_type("auction", root, compile=compiled)
+    assert compiled.calls == ["auction"]
+    assert path.exists()
+    assert list(path.parent.glob("*.partial")) == []
+
+    cached = load_contract_type("auction", root, compile=compiled)
+    assert compiled.calls == ["auction"]
+    assert cached.abi == contract_type.abi
+    assert (
+        cached.deployment_bytecode == project.auction.contract_type.deployment_bytecode
+    )
+
+
+def test_cache_invalidated_by_source_change(root, compiled):
+    load_contract_type("auction", root, compile=compiled)
+    (root / "contracts" / "auction.vy").write_text("# pragma version ~=0.4.3\n")
+    load_contract_type("auction", root, compile=compiled)
+    assert compiled.calls == ["auction", "auction"]
+    assert len(list(artifact_path("auction", root).parent.iterdir())) == 2
+
+
+def test_invalid_cache_is_recompiled(root, compiled):
+    path = artifact_path("auction", root)
+    path.parent.mkdir(parents=True)
+    path.write_text('{"abi": [')
+
+    contract_type = load_contract_type("auction", root, compile=compiled)
+    assert compiled.calls == ["auction"]
+    assert load_contract_type("auction", root, compile=compiled) == contract_type
+    assert compiled.calls == ["auction"]
+
+
+def test_concurrent_writer_partial_file_is_left_alone(root, compiled):
+    # Another job still writing its own copy of the artifact.
+    path = artifact_path("auction", root)
+    path.parent.mkdir(parents=True)
+    other = path.parent / f"{path.stem}.other.partial"
+    other.write_text('{"abi": [')
+
+    load_contract_type("auction", root, compile=compiled)
+    assert path.exists()
+    assert list(path.parent.glob("*.partial")) == [other]
+    assert other.read_text() == '{"abi": ['
+
+
+def test_container_deploys(mock_erc20, deployer):
+    auction = container("auction").deploy(mock_erc20, 60, sender=deployer)
+    assert auction.get_round_duration() == 60
+    assert auction.owner() == deployer
+
+
+def test_run_standalone_connects_to_network(networks):
+    seen = []
+    run_standalone(
+        lambda: seen.append(networks.provider.network.name),
+        ["--network", "ethereum:local:test"],
+    )
+    assert seen == ["local"]
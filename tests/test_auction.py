@@ -705,3 +705,146 @@ def test_latests_bidded_songs_rollover(auction, mock_erc20, deployer, bidder1, s
         assert latests[idx].title == f"Song {i}"
         assert latests[idx].artist == f"Artist {i}"
         assert latests[idx].iframe_url == f"https://open.spotify.com/embed/track/{i}"
+
+
+def assert_preview_matches_bid(auction, bidder, amount, song, code, message):
+    """`preview_bid` returns `code` and `bid` reverts with `message`"""
+    reason, _ = auction.preview_bid(bidder, amount, song)
+    assert reason == code
+    with ape.reverts(message):
+        auction.bid(amount, song, sender=bidder)
+
+
+def test_preview_bid_ok(auction, mock_erc20, deployer, bidder1, song):
+    mock_erc20.mint(bidder1, 1000, sender=deployer)
+    mock_erc20.approve(auction.address, 1000, sender=bidder1)
+
+    assert auction.preview_bid(bidder1, 100, song) == (auction.BID_OK(), 1)
+    auction.bid(100, song, sender=bidder1)
+    # The highest bidder can outbid itself, as `bid` allows.
+    assert auction.preview_bid(bidder1, 101, song) == (auction.BID_OK(), 101)
+
+
+def test_preview_bid_round_not_started(chain, auction, bidder1, song):
+    # Rounds start at the block they are created in, so the only way to
+    # be early is a call at a pending block set before the start time.
+    backend = chain.provider.evm_backend
+    header = backend.chain.header
+    start_time = auction.get_round_start_time(auction.get_current_round_id())
+    backend.chain.header = header.copy(timestamp=start_time - 1)
+    try:
+        reason, min_amount = auction.preview_bid(bidder1, 100, song, block_id="pending")
+    finally:
+        backend.chain.header = header
+    assert (reason, min_amount) == (auction.BID_ROUND_NOT_STARTED(), 1)
+
+
+def test_preview_bid_round_is_over(chain, auction, mock_erc20, deployer, bidder1, song):
+    mock_erc20.mint(bidder1, 1000, sender=deployer)
+    mock_erc20.approve(auction.address, 1000, sender=bidder1)
+    chain.pending_timestamp += auction.get_round_duration()
+    chain.mine()
+
+    assert_preview_matches_bid(
+        auction,
+        bidder1,
+        100,
+        song,
+        auction.BID_ROUND_IS_OVER(),
+        "auction: round is over",
+    )
+
+
+def test_preview_bid_too_low(auction, mock_erc20, deployer, bidder1, bidder2, song):
+    for bidder in (bidder1, bidder2):
+        mock_erc20.mint(bidder, 1000, sender=deployer)
+        mock_erc20.approve(auction.address, 1000, sender=bidder)
+    auction.bid(100, song, sender=bidder1)
+
+    assert auction.preview_bid(bidder2, 100, song) == (auction.BID_TOO_LOW(), 101)
+    assert_preview_matches_bid(
+        auction, bidder2, 100, song, auction.BID_TOO_LOW(), "auction: bid is too low"
+    )
+    assert auction.preview_bid(bidder2, 0, song)[0] == auction.BID_TOO_LOW()
+
+
+def test_preview_bid_invalid_song_url(auction, mock_erc20, deployer, bidder1, song):
+    mock_erc20.mint(bidder1, 1000, sender=deployer)
+    mock_erc20.approve(auction.address, 1000, sender=bidder1)
+    invalid = {**song, "iframe_url": "https://example.com/embed/track/1"}
+
+    assert_preview_matches_bid(
+        auction,
+        bidder1,
+        100,
+        invalid,
+        auction.BID_INVALID_SONG_URL(),
+        "auction: invalid song url",
+    )
+
+
+def test_preview_bid_insufficient_balance(auction, mock_erc20, deployer, bidder1, song):
+    mock_erc20.mint(bidder1, 50, sender=deployer)
+    mock_erc20.approve(auction.address, 1000, sender=bidder1)
+
+    assert_preview_matches_bid(
+        auction,
+        bidder1,
+        100,
+        song,
+        auction.BID_INSUFFICIENT_BALANCE(),
+        "erc20: transfer amount exceeds balance",
+    )
+
+
+def test_preview_bid_insufficient_allowance(
+    auction, mock_erc20, deployer, bidder1, song
+):
+    mock_erc20.mint(bidder1, 1000, sender=deployer)
+    mock_erc20.approve(auction.address, 50, sender=bidder1)
+
+    assert_preview_matches_bid(
+        auction,
+        bidder1,
+        100,
+        song,
+        auction.BID_INSUFFICIENT_ALLOWANCE(),
+        "erc20: insufficient allowance",
+    )
+
+
+def test_preview_bid_checks_in_bid_order(chain, auction, bidder1, song):
+    # Nothing is minted or approved: the first failing check is reported,
+    # and `bid` reverts on that same check.
+    invalid = {**song, "iframe_url": ""}
+    assert_preview_matches_bid(
+        auction, bidder1, 0, invalid, auction.BID_TOO_LOW(), "auction: bid is too low"
+    )
+    assert_preview_matches_bid(
+        auction,
+        bidder1,
+        1,
+        invalid,
+        auction.BID_INVALID_SONG_URL(),
+        "auction: invalid song url",
+    )
+    # Both short: `transferFrom` checks the allowance first.
+    assert_preview_matches_bid(
+        auction,
+        bidder1,
+        1,
+        song,
+        auction.BID_INSUFFICIENT_ALLOWANCE(),
+        "erc20: insufficient allowance",
+    )
+
+    chain.pending_timestamp += auction.get_round_duration()
+    chain.mine()
+    assert_preview_matches_bid(
+        auction,
+        bidder1,
+        0,
+        invalid,
+        auction.BID_ROUND_IS_OVER(),
+        "auction: round is over",
+    )
@@ -0,0 +1,155 @@
+import ape
+
+from scripts.deploy import deploy_auctions
+from scripts.reads import read_auctions
+
+
+def create_auction(auction_factory, name, round_duration, sender):
+    tx = auction_factory.create_auction(name, round_duration, sender=sender)
+    return tx.events.filter(auction_factory.AuctionCreated)[0].auction
+
+
+def test_initialization(auction_factory, mock_erc20, deployer):
+    """Test factory initialization"""
+    assert auction_factory.songcoin() == mock_erc20.address
+    assert auction_factory.owner() == deployer.address
+    assert auction_factory.get_auction_count() == 0
+    assert auction_factory.get_auctions() == []
+
+
+def test_create_auction(project, auction_factory, mock_erc20, deployer):
+    """Test creating an auction instance"""
+    tx = auction_factory.create_auction("rock", 60 * 60, sender=deployer)
+    event = tx.events.filter(auction_factory.AuctionCreated)[0]
+    address = event.auction
+    assert event.name == "rock"
+    assert event.round_duration == 60 * 60
+
+    assert auction_factory.get_auctions() == [address]
+    assert auction_factory.auctions(0) == address
+    assert auction_factory.auction_names(address) == "rock"
+    assert auction_factory.is_auction(address)
+
+    instance = project.auction.at(address)
+    assert instance.songcoin() == mock_erc20.address
+    assert instance.get_round_duration() == 60 * 60
+    assert instance.owner() == deployer.address
+    assert instance.get_current_round_id() == 0
+    assert instance.genesis_round_called()
+
+
+def test_create_auction_is_cheaper_than_deploy(
+    project, auction_factory, mock_erc20, deployer
+):
+    """Test a blueprint instance costs less than a full deployment"""
+    created = auction_factory.create_auction("jazz", 60, sender=deployer)
+    deployed = project.auction.deploy(mock_erc20.address, 60, sender=deployer)
+    assert created.gas_used < deployed.creation_metadata.receipt.gas_used
+
+
+def test_create_auction_validation(auction_factory, deployer, bidder1):
+    """Test create auction validation"""
+    with ape.reverts("ownable: caller is not the owner"):
+        auction_factory.create_auction("rock", 60, sender=bidder1)
+    with ape.reverts("auction_factory: invalid round duration"):
+        auction_factory.create_auction("rock", 0, sender=deployer)
+
+
+def test_deploy_auctions(project, mock_erc20, deployer):
+    """Test the deploy script creates its instances through the factory"""
+    factory, instances = deploy_auctions(
+        deployer,
+        mock_erc20.address,
+        [("daily", 60 * 60 * 24), ("hourly", 60 * 60)],
+        publish=False,
+    )
+    assert factory.songcoin() == mock_erc20.address
+    assert factory.get_auctions() == instances
+    assert [factory.auction_names(a) for a in instances] == ["daily", "hourly"]
+    durations = [project.auction.at(a).get_round_duration() for a in instances]
+    assert durations == [60 * 60 * 24, 60 * 60]
+
+
+def test_instances_are_independent(
+    chain, project, auction_factory, mock_erc20, deployer, bidder1, song
+):
+    """Test instances run their own rounds"""
+    short = project.auction.at(create_auction(auction_factory, "short", 60, deployer))
+    long = project.auction.at(
+        create_auction(auction_factory, "long", 60 * 60, deployer)
+    )
+    mock_erc20.mint(bidder1, 100_0000, sender=deployer)
+    mock_erc20.approve(short.address, 1000, sender=bidder1)
+    short.bid(100, song, sender=bidder1)
+
+    chain.pending_timestamp += 60
+    chain.mine()
+    short.end_round_and_start_new_round(sender=deployer)
+    with ape.reverts("auction: round has not ended"):
+        long.end_round_and_start_new_round(sender=deployer)
+
+    assert short.get_current_round_id() == 1
+    assert short.last_winning_round().highest_bid == 100
+    assert long.get_current_round_id() == 0
+    assert mock_erc20.balanceOf(short.address) == 0
+
+
+def test_read_auctions(
+    chain,
+    project,
+    auction_factory,
+    mock_erc20,
+    deployer,
+    bidder1,
+    song,
+    multicall_address,
+):
+    """Test reading every instance with batched calls"""
+    assert (
+        read_auctions(
+            auction_factory,
+            project.auction.contract_type,
+            multicall_address=multicall_address,
+        )
+        == []
+    )
+
+    names = ["rock", "jazz", "pop"]
+    addresses = [create_auction(auction_factory, name, 60, deployer) for name in names]
+    mock_erc20.mint(bidder1, 100_0000, sender=deployer)
+    mock_erc20.approve(addresses[1], 1000, sender=bidder1)
+    mock_erc20.approve(addresses[2], 1000, sender=bidder1)
+    project.auction.at(addresses[1]).bid(100, song, sender=bidder1)
+
+    states = read_auctions(
+        auction_factory,
+        project.auction.contract_type,
+        multicall_address=multicall_address,
+    )
+    assert [s.address for s in states] == addresses
+    assert [s.name for s in states] == names
+    assert [s.round.highest_bid for s in states] == [0, 100, 0]
+    assert states[1].round.highest_bidder == bidder1.address
+    assert states[1].round.song.title == song["title"]
+
+    # A known registry skips the listing
+    states = read_auctions(
+        auction_factory,
+        project.auction.contract_type,
+        auctions=addresses[:1],
+        multicall_address=multicall_address,
+    )
+    assert [s.name for s in states] == ["rock"]
+
+    # Split into batches, pinned to the same block
+    block_id = chain.blocks.head.number
+    project.auction.at(addresses[2]).bid(100, song, sender=bidder1)
+    states = read_auctions(
+        auction_factory,
+        project.auction.contract_type,
+        block_id=block_id,
+        multicall_address=multicall_address,
+        batch=2,
+    )
+    assert [s.name for s in states] == names
+    assert [s.round.highest_bid for s in states] == [0, 100, 0]
@@ -0,0 +1,331 @@
+import asyncio
+import threading
+
+import pytest
+
+from scripts.bidder import CANCELLED, PLACED, REVERTED, STUCK, BidManager, Nonces
+from scripts.transactions import CANCEL_GAS_LIMIT, FeePolicy, Fees, broadcast
+
+GWEI = 10**9
+INCREMENT = 10
+
+
+class HeldMempool:
+    """
+    Holds our transactions back, like a congested mempool, until they are
+    released to the chain. A transaction with the same sender and nonce
+    replaces the held one.
+    """
+
+    def __init__(self):
+        self.held = {}
+
+    def send(self, account, txn):
+        self.held[(account.address, txn.nonce)] = (account, txn)
+        return account.sign_transaction(txn).txn_hash.to_0x_hex()
+
+    def release(self, account=None):
+        """
+        Broadcasts the held transactions, only those of `account` if given.
+        """
+        for key, (sender, txn) in list(self.held.items()):
+            if account is None or sender.address == account.address:
+                broadcast(sender, txn)
+                del self.held[key]
+
+
+class Competitor:
+    """
+    A bidder outside of the manager, bidding straight into the pool.
+    """
+
+    def __init__(self, auction, account, song):
+        self.auction = auction
+        self.account = account
+        self.song = song
+
+    def bid(self, amount):
+        txn = self.auction.bid.as_transaction(
+            amount,
+            self.song,
+            sender=self.account,
+            gas_limit=1_000_000,
+            max_fee=100 * GWEI,
+            max_priority_fee=2 * GWEI,
+        )
+        return broadcast(self.account, txn)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def funded(auction, mock_erc20, deployer, bidder1, bidder2, bidder3):
+    for bidder in (bidder1, bidder2, bidder3):
+        mock_erc20.mint(bidder, 10**24, sender=deployer)
+        mock_erc20.approve(auction.address, 10**24, sender=bidder)
+
+
+@pytest.fixture(autouse=True)
+def fresh_round(chain, auction, deployer):
+    # Every test starts with a new, empty round.
+    chain.pending_timestamp = max(
+        chain.pending_timestamp,
+        auction.get_round_end_time(auction.get_current_round_id()),
+    )
+    chain.mine()
+    auction.end_round_and_start_new_round(sender=deployer)
+    return auction.get_current_round_id()
+
+
+@pytest.fixture
+def manual_mining(fresh_round, manual_mining):
+    # Roll the round before mining goes manual.
+    return manual_mining
+
+
+@pytest.fixture
+def mempool():
+    return HeldMempool()
+
+
+@pytest.fixture
+def manager(chain, auction, mempool):
+    return BidManager(
+        auction,
+        FeePolicy(priority_fee=GWEI, max_fee_cap=100 * GWEI),
+        increment=INCREMENT,
+        send=mempool.send,
+        clock=lambda: chain.pending_timestamp,
+    )
+
+
+@pytest.fixture
+def competitor(auction, bidder2, song2):
+    return Competitor(auction, bidder2, song2)
+
+
+def test_nonces_are_local(bidder1, bidder2):
+    fetched = []
+
+    def fetch(account):
+        fetched.append(account.address)
+        return 5
+
+    nonces = Nonces(fetch)
+    assert [nonces.reserve(bidder1) for _ in range(3)] == [5, 6, 7]
+    assert nonces.reserve(bidder2) == 5
+    assert fetched == [bidder1.address, bidder2.address]
+
+    nonces.release(bidder1, 7)
+    assert nonces.reserve(bidder1) == 7
+    # Releasing an older nonce leaves a gap, so the node is asked again.
+    nonces.release(bidder1, 6)
+    assert nonces.reserve(bidder1) == 5
+    assert fetched == [bidder1.address, bidder2.address, bidder1.address]
+
+
+def test_bid_placed(auction, bidder1, song, manager, mempool, manual_mining):
+    bid = manager.submit(bidder1, 100, song)
+    assert manager.poll() == []
+
+    mempool.release()
+    manual_mining()
+    (result,) = manager.poll()
+    assert result.status == PLACED
+    assert result.amount == 100
+    assert result.blocks == 1
+    assert result.wasted_gas == 0
+    assert result.txn_hash == bid.transactions[0][0]
+    assert auction.get_round_highest_bidder(bid.round_id) == bidder1
+    assert manager.pending == []
+
+
+def test_replaces_outbid_bid(
+    auction, bidder1, bidder2, song, manager, mempool, competitor, manual_mining
+):
+    bid = manager.submit(bidder1, 100, song, max_amount=1_000)
+    competitor.bid(150)
+    manual_mining()
+
+    assert manager.poll() == []
+    assert bid.amount == 150 + INCREMENT
+    assert bid.replacements == 1
+    assert bid.outbid_by == bidder2.address
+    assert len(mempool.held) == 1
+
+    mempool.release()
+    manual_mining()
+    (result,) = manager.poll()
+    assert result.status == PLACED
+    assert result.amount == 150 + INCREMENT
+    assert result.replacements == 1
+    assert result.outbid_by == bidder2.address
+    assert result.wasted_gas == 0
+    assert auction.get_current_round_highest_bid() == 150 + INCREMENT
+    assert auction.get_round_highest_bidder(bid.round_id) == bidder1
+
+
+def test_cancels_bid_outbid_above_max(
+    auction, bidder1, bidder2, song, manager, mempool, competitor, manual_mining
+):
+    bid = manager.submit(bidder1, 100, song, max_amount=120)
+    competitor.bid(150)
+    manual_mining()
+
+    manager.poll()
+    assert bid.cancelled
+
+    mempool.release()
+    manual_mining()
+    (result,) = manager.poll()
+    assert result.status == CANCELLED
+    assert result.amount is None
+    assert result.wasted_gas == CANCEL_GAS_LIMIT
+    assert result.wasted_cost > 0
+    assert auction.get_round_highest_bidder(bid.round_id) == bidder2
+
+
+def test_does_not_outbid_managed_accounts(
+    auction, bidder1, bidder3, song, manager, mempool, manual_mining
+):
+    low = manager.submit(bidder1, 100, song, max_amount=1_000)
+    high = manager.submit(bidder3, 150, song, max_amount=1_000)
+    mempool.release(bidder3)
+    manual_mining()
+
+    (result,) = manager.poll()
+    assert result.bidder == bidder3.address
+    assert result.status == PLACED
+    # Not raised against bidder3, only cancelled since it would revert.
+    assert low.replacements == 0
+    assert low.cancelled
+    assert low.outbid_by == bidder3.address
+
+    mempool.release()
+    manual_mining()
+    (result,) = manager.poll()
+    assert result.status == CANCELLED
+    assert auction.get_round_highest_bidder(high.round_id) == bidder3
+    assert auction.get_current_round_highest_bid() == 150
+
+
+def test_reverted_bid_reports_wasted_gas(
+    bidder1, song, manager, mempool, competitor, manual_mining
+):
+    manager.submit(bidder1, 100, song)
+    # Outbid within the same block: too late for the manager to react.
+    competitor.bid(150)
+    mempool.release()
+    manual_mining()
+
+    (result,) = manager.poll()
+    assert result.status == REVERTED
+    assert result.wasted_gas > CANCEL_GAS_LIMIT
+    assert manager.report().wasted_gas == result.wasted_gas
+
+
+def test_cancels_bid_when_round_is_over(
+    chain, auction, bidder1, song, manager, mempool, manual_mining
+):
+    bid = manager.submit(bidder1, 100, song)
+    chain.pending_timestamp = auction.get_round_end_time(bid.round_id)
+
+    manager.poll()
+    assert bid.cancelled
+    mempool.release()
+    manual_mining()
+    (result,) = manager.poll()
+    assert result.status == CANCELLED
+
+
+def test_gives_up_on_bid_at_max_fee_cap(chain, auction, bidder1, song, manager):
+    bid = manager.submit(bidder1, 100, song)
+    # Already replaced up to the cap, so no cancel can be priced above it.
+    bid.fees = Fees(max_fee=100 * GWEI, max_priority_fee=GWEI)
+    chain.pending_timestamp = auction.get_round_end_time(bid.round_id)
+
+    report = asyncio.run(manager.settle())
+    (result,) = report.results
+    assert result.status == STUCK
+    assert result.txn_hash == bid.transactions[-1][0]
+    assert result.wasted_gas == 0
+    assert not manager.pending
+    # No cancel was sent.
+    assert not bid.cancelled
+    assert len(bid.transactions) == 1
+    assert "0 reverted, 1 stuck" in report.summary()
+
+
+def test_bumps_fees_of_stuck_bid(chain, bidder1, song, manager, mempool):
+    bid = manager.submit(bidder1, 100, song)
+    fees = bid.fees
+    chain.pending_timestamp += int(manager.replace_after)
+
+    manager.poll()
+    assert bid.amount == 100
+    assert bid.replacements == 1
+    assert bid.fees.max_fee > fees.max_fee
+    assert bid.fees.max_priority_fee > fees.max_priority_fee
+
+    mempool.release()
+    chain.mine()
+    (result,) = manager.poll()
+    assert result.status == PLACED
+    assert result.txn_hash == bid.transactions[-1][0]
+
+
+def test_settle_with_competing_bidders(
+    chain,
+    auction,
+    bidder1,
+    bidder2,
+    bidder3,
+    song,
+    manager,
+    mempool,
+    competitor,
+    manual_mining,
+):
+    # Two managed accounts bid on the same song at once, with local
+    # nonces. The competitor outbids both before either is mined; only
+    # bidder3 is allowed to go higher.
+    low = manager.submit(bidder1, 100, song, max_amount=150)
+    high = manager.submit(bidder3, 110, song, max_amount=10_000)
+    assert (low.nonce, high.nonce) == (bidder1.nonce, bidder3.nonce)
+
+    steps = iter(
+        [
+            lambda: competitor.bid(200),
+            mempool.release,
+        ]
+    )
+
+    async def sleep(seconds):
+        chain.pending_timestamp += int(seconds)
+        next(steps, lambda: None)()
+        manual_mining()
+
+    poll, threads = manager.poll, set()
+
+    def polled():
+        threads.add(threading.get_ident())
+        return poll()
+
+    manager.sleep = sleep
+    manager.poll = polled
+    report = asyncio.run(manager.settle())
+    # Polls are blocking and run off the event loop's thread.
+    assert threads and threading.get_ident() not in threads
+
+    by_bidder = {result.bidder: result for result in report.results}
+    assert by_bidder[bidder1.address].status == CANCELLED
+    assert by_bidder[bidder3.address].status == PLACED
+    assert by_bidder[bidder3.address].amount == 200 + INCREMENT
+    assert by_bidder[bidder3.address].outbid_by == bidder2.address
+    assert auction.get_round_highest_bidder(high.round_id) == bidder3
+
+    assert report.count(PLACED) == report.count(CANCELLED) == 1
+    assert report.wasted_gas == CANCEL_GAS_LIMIT
+    summary = report.summary()
+    assert (
+        "2 bids: 1 placed, 1 cancelled, 0 reverted, 0 stuck, 1 replacements" in summary
+    )
+    assert "wasted gas: 21000" in summary
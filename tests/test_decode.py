@@ -0,0 +1,212 @@
+import pytest
+from eth_abi import encode
+from eth_utils import keccak
+
+from scripts.decode import (
+    AGGREGATE3_SELECTOR,
+    ROUNDS_SELECTOR,
+    SONG_BID_TOPIC,
+    checksum_addresses,
+    decode_round,
+    decode_song_bid,
+    fetch_block_timestamps,
+    fetch_song_bid_logs,
+    read_round_data,
+    rounds_array,
+    song_bids_array,
+    split_aggregate3,
+)
+
+ROUND_TYPE = (
+    "(uint256,address,uint256,bool,uint256,uint256,(string,string,bytes32,string))"
+)
+
+
+def song_fields(song):
+    return [song.title, song.artist, song.iframe_hash, song.iframe_url]
+
+
+def assert_round_matches(decoded, expected):
+    assert decoded.id == expected.id
+    assert decoded.highest_bidder == expected.highest_bidder
+    assert decoded.highest_bid == expected.highest_bid
+    assert decoded.ended == expected.ended
+    assert decoded.start_time == expected.start_time
+    assert decoded.end_time == expected.end_time
+    assert song_fields(decoded.song) == song_fields(expected.song)
+
+
+@pytest.fixture(scope="module")
+def bids(chain, auction, mock_erc20, deployer, bidder1, bidder2, song, song2):
+    mock_erc20.mint(bidder1, 10**24, sender=deployer)
+    mock_erc20.mint(bidder2, 10**24, sender=deployer)
+    mock_erc20.approve(auction.address, 10**24, sender=bidder1)
+    mock_erc20.approve(auction.address, 10**24, sender=bidder2)
+    start_block = chain.blocks.height
+
+    auction.bid(10**18, song, sender=bidder1)
+    auction.bid(10**21, song2, sender=bidder2)
+    chain.pending_timestamp += auction.get_round_duration()
+    chain.mine()
+    auction.end_round_and_start_new_round(sender=deployer)
+    auction.bid(3 * 10**20, song, sender=bidder1)
+    return start_block
+
+
+@pytest.fixture
+def round_data(auction, multicall_address, bids):
+    ids = range(auction.get_current_round_id() + 1)
+    return read_round_data(auction, ids, multicall_address=multicall_address, batch=1)
+
+
+def test_selectors(auction):
+    song_bid = auction.contract_type.events["SongBid"]
+    assert SONG_BID_TOPIC == keccak(text=song_bid.selector)
+    assert ROUNDS_SELECTOR == keccak(text="rounds(uint256)")[:4]
+    assert AGGREGATE3_SELECTOR == keccak(text="aggregate3((address,bool,bytes)[])")[:4]
+
+
+def test_decode_round_matches_ape(auction, round_data):
+    assert len(round_data) == auction.get_current_round_id() + 1
+    for i, data in enumerate(round_data):
+        assert_round_matches(decode_round(data), auction.rounds(i))
+
+
+def test_decode_song_bid_matches_ape(chain, auction, bids):
+    logs = fetch_song_bid_logs(auction, bids, page=2)
+    expected = list(auction.SongBid.range(bids, chain.blocks.height + 1))
+    assert len(logs) == len(expected) == 3
+
+    for log, want in zip(logs, expected):
+        decoded = decode_song_bid(log)
+        assert decoded.block_number == want.block_number
+        assert decoded.log_index == want.log_index
+        assert decoded.sender == want.sender
+        assert decoded.round_id == want.round_id
+        assert decoded.amount == want.amount
+        assert song_fields(decoded.song) == list(want.song)
+
+
+def test_rounds_array_matches_records(round_data):
+    records, songs = rounds_array(round_data)
+    for row, data in zip(records, round_data):
+        expected = decode_round(data)
+        assert row["id"] == expected.id
+        assert row["highest_bidder"].ljust(20, b"\0").hex() == (
+            expected.highest_bidder[2:].lower()
+        )
+        assert row["highest_bid"] == pytest.approx(expected.highest_bid)
+        assert row["ended"] == expected.ended
+        assert row["start_time"] == expected.start_time
+        assert row["end_time"] == expected.end_time
+        assert row["iframe_hash"].ljust(32, b"\0") == expected.song.iframe_hash
+        assert songs[row["song"]] == expected.song.iframe_url
+
+
+def test_song_bids_array_matches_records(auction, bids):
+    logs = fetch_song_bid_logs(auction, bids)
+    records, songs = song_bids_array(logs)
+    expected = [decode_song_bid(log) for log in logs]
+
+    assert records["block_number"].tolist() == [e.block_number for e in expected]
+    assert records["log_index"].tolist() == [e.log_index for e in expected]
+    assert records["round_id"].tolist() == [e.round_id for e in expected]
+    assert records["amount"].tolist() == [float(e.amount) for e in expected]
+    assert checksum_addresses(records["sender"]).tolist() == [
+        e.sender for e in expected
+    ]
+    assert songs[records["song"]].tolist() == [e.song.iframe_url for e in expected]
+    # One code per distinct url.
+    assert len(songs) == len({e.song.iframe_url for e in expected})
+
+
+@pytest.mark.parametrize(
+    "title, artist, bidder, amount",
+    [
+        ("", "", "0x" + "00" * 20, 0),
+        ("Canción ✨", "Ärtist", "0x" + "ab" * 19 + "00", 2**256 - 1),
+        ("x" * 32, "y" * 32, "0x" + "ff" * 20, 10**24),
+    ],
+)
+def test_edge_cases_match_ape(networks, auction, title, artist, bidder, amount):
+    data = encode(
+        [ROUND_TYPE],
+        [
+            (
+                2**64 - 1,
+                bidder,
+                amount,
+                True,
+                1,
+                2,
+                (title, artist, b"\x01" * 32, "https://open.spotify.com/embed/x"),
+            )
+        ],
+    )
+    abi = auction.contract_type.view_methods["rounds"]
+    expected = networks.ethereum.decode_returndata(abi, data)[0]
+    assert_round_matches(decode_round(data), expected)
+
+    records, _ = rounds_array([data])
+    assert records["id"][0] == 2**64 - 1
+    assert records["highest_bid"][0] == pytest.approx(float(amount))
+    assert checksum_addresses(records["highest_bidder"])[0] == expected.highest_bidder
+
+
+def test_rounds_array_rejects_ids_over_64_bits():
+    data = encode(
+        [ROUND_TYPE],
+        [(2**64, "0x" + "00" * 20, 0, False, 0, 0, ("", "", b"\0" * 32, ""))],
+    )
+    with pytest.raises(ValueError, match="64 bits"):
+        rounds_array([data])
+
+
+def test_fetch_block_timestamps(chain, bids):
+    numbers = list(range(bids, chain.blocks.height + 1))
+    expected = [chain.blocks[n].timestamp for n in numbers]
+    assert fetch_block_timestamps(numbers).tolist() == expected
+
+
+def test_fetch_block_timestamps_in_batches(chain, monkeypatch, bids):
+    # eth-tester cannot batch, so batches are emulated by running each
+    # request as it is added.
+    web3 = chain.provider.web3
+    sizes = []
+
+    class Batch:
+        def __enter__(self):
+            self.results = []
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def add(self, result):
+            self.results.append(result)
+
+        def execute(self):
+            sizes.append(len(self.results))
+            return self.results
+
+    monkeypatch.setattr(web3, "batch_requests", Batch, raising=False)
+    numbers = list(range(bids, chain.blocks.height + 1))
+    expected = [chain.blocks[n].timestamp for n in numbers]
+    assert fetch_block_timestamps(numbers, batch=2).tolist() == expected
+    assert sizes == [len(numbers[i : i + 2]) for i in range(0, len(numbers), 2)]
+
+
+def test_split_aggregate3_failed_call():
+    data = encode(["(bool,bytes)[]"], [[(True, b"\x01" * 40), (False, b"")]])
+    with pytest.raises(ValueError, match="call 1"):
+        split_aggregate3(data)
+
+    results = split_aggregate3(encode(["(bool,bytes)[]"], [[(True, b"\x01" * 40)]]))
+    assert [bytes(result) for result in results] == [b"\x01" * 40]
+
+
+def test_empty_inputs():
+    records, songs = song_bids_array([])
+    assert len(records) == len(songs) == 0
+    records, songs = rounds_array([])
+    assert len(records) == len(songs) == 0
@@ -0,0 +1,280 @@
+import asyncio
+
+import pytest
+
+from scripts.feed import AuctionFeed, Event, Subscriber, create_app
+from scripts.reads import read_snapshot
+
+
+@pytest.fixture
+def feed(auction, multicall_address):
+    feed = AuctionFeed(auction, multicall_address=multicall_address)
+    asyncio.run(feed.poll())
+    return feed
+
+
+@pytest.fixture
+def rpc_requests(chain, monkeypatch):
+    """
+    The methods of the JSON-RPC requests sent through the provider.
+    """
+    provider = chain.provider.web3.provider
+    requests = []
+    make_request = provider.make_request
+
+    def counting(method, params):
+        requests.append(method)
+        return make_request(method, params)
+
+    monkeypatch.setattr(provider, "make_request", counting)
+    # web3 caches the request function wrapping `make_request`.
+    monkeypatch.setattr(provider, "_request_func_cache", (None, None))
+    return requests
+
+
+def drain(subscriber):
+    events = []
+    while subscriber.qsize():
+        events.append(asyncio.run(subscriber.get()))
+    return events
+
+
+def test_read_snapshot(
+    chain, auction, mock_erc20, deployer, bidder1, song, multicall_address
+):
+    mock_erc20.mint(bidder1, 100_0000, sender=deployer)
+    mock_erc20.approve(auction.address, 1000, sender=bidder1)
+    auction.bid(100, song, sender=bidder1)
+
+    snapshot = read_snapshot(auction, multicall_address=multicall_address)
+    assert snapshot.block_number == chain.blocks.head.number
+    assert snapshot.round.id == auction.get_current_round_id()
+    assert snapshot.round.highest_bidder == bidder1.address
+    assert snapshot.round.highest_bid == 100
+    assert snapshot.as_dict()["round"]["highest_bid"] == "100"
+    assert snapshot.as_dict()["round"]["song"]["title"] == song["title"]
+
+
+def test_snapshot_on_connect(feed, auction):
+    subscriber = feed.subscribe()
+    (event,) = drain(subscriber)
+    assert event.type == "snapshot"
+    assert event.block_number == feed.snapshot.block_number
+    assert event.data["round"]["id"] == auction.get_current_round_id()
+
+
+def test_subscribe_before_poll(auction, multicall_address):
+    with pytest.raises(RuntimeError):
+        AuctionFeed(auction, multicall_address=multicall_address).subscribe()
+
+
+def fund(auction, mock_erc20, deployer, *bidders):
+    for bidder in bidders:
+        mock_erc20.mint(bidder, 100_0000, sender=deployer)
+        mock_erc20.approve(auction.address, 1000, sender=bidder)
+
+
+def roll(chain, auction, deployer):
+    chain.pending_timestamp += auction.get_round_duration()
+    chain.mine()
+    auction.end_round_and_start_new_round(sender=deployer)
+
+
+def test_fan_out(
+    chain,
+    feed,
+    auction,
+    mock_erc20,
+    deployer,
+    bidder1,
+    bidder2,
+    song,
+    song2,
+):
+    fund(auction, mock_erc20, deployer, bidder1, bidder2)
+    round_id = auction.get_current_round_id()
+    asyncio.run(feed.poll())
+
+    subscribers = [feed.subscribe() for _ in range(50)]
+    auction.bid(100, song, sender=bidder1)
+    auction.bid(200, song2, sender=bidder2)
+    roll(chain, auction, deployer)
+
+    events = asyncio.run(feed.poll())
+    assert [e.type for e in events] == ["bid", "bid", "round"]
+    assert events[0].data["sender"] == bidder1.address
+    assert events[1].data["amount"] == "200"
+    assert events[1].data["song"]["title"] == song2["title"]
+    assert events[2].data["previous_round_id"] == round_id
+    assert events[2].data["round"]["id"] == round_id + 1
+    assert events[2].data["last_winning_round"]["highest_bidder"] == bidder2.address
+
+    for subscriber in subscribers:
+        assert [e.type for e in drain(subscriber)] == [
+            "snapshot",
+            "bid",
+            "bid",
+            "round",
+        ]
+
+
+def test_upstream_requests_do_not_depend_on_subscribers(
+    feed, auction, mock_erc20, deployer, bidder1, song, rpc_requests
+):
+    fund(auction, mock_erc20, deployer, bidder1)
+    asyncio.run(feed.poll())
+
+    requests = []
+    for count, amount in ((1, 100), (50, 200)):
+        subscribers = [feed.subscribe() for _ in range(count)]
+        auction.bid(amount, song, sender=bidder1)
+        rpc_requests.clear()
+        (event,) = asyncio.run(feed.poll())
+        assert event.type == "bid"
+        requests.append(list(rpc_requests))
+        for subscriber in subscribers:
+            assert drain(subscriber)[-1] == event
+            feed.unsubscribe(subscriber)
+
+    assert requests[0] == requests[1]
+    assert requests[0].count("eth_getLogs") == 1
+    assert requests[0].count("eth_call") == 1
+
+    # Nothing new: only the header is fetched
+    rpc_requests.clear()
+    assert asyncio.run(feed.poll()) == []
+    assert rpc_requests == ["eth_getBlockByNumber"]
+
+
+def test_round_event_is_ordered_among_bids(
+    chain, feed, auction, mock_erc20, deployer, bidder1, bidder2, song, song2
+):
+    fund(auction, mock_erc20, deployer, bidder1, bidder2)
+    round_id = auction.get_current_round_id()
+    asyncio.run(feed.poll())
+
+    auction.bid(100, song, sender=bidder1)
+    roll(chain, auction, deployer)
+    roll_block = chain.blocks.head.number
+    chain.mine()
+    auction.bid(300, song2, sender=bidder2)
+
+    events = asyncio.run(feed.poll())
+    assert [(e.type, e.data.get("round_id")) for e in events] == [
+        ("bid", round_id),
+        ("round", None),
+        ("bid", round_id + 1),
+    ]
+    assert events[1].block_number == roll_block
+    assert events[0].block_number < roll_block < events[2].block_number
+    # The round as it was when it started, before the later bid.
+    assert events[1].data["round"]["id"] == round_id + 1
+    assert events[1].data["round"]["highest_bid"] == "0"
+    assert events[1].data["last_winning_round"]["highest_bidder"] == bidder1.address
+
+
+def test_round_events_for_every_roll_in_window(
+    chain, feed, auction, mock_erc20, deployer, bidder1, bidder2, song, song2
+):
+    fund(auction, mock_erc20, deployer, bidder1, bidder2)
+    round_id = auction.get_current_round_id()
+    asyncio.run(feed.poll())
+
+    auction.bid(100, song, sender=bidder1)
+    roll(chain, auction, deployer)
+    auction.bid(200, song2, sender=bidder2)
+    roll(chain, auction, deployer)
+    auction.bid(300, song, sender=bidder1)
+
+    events = asyncio.run(feed.poll())
+    assert [(e.type, e.data.get("round_id")) for e in events] == [
+        ("bid", round_id),
+        ("round", None),
+        ("bid", round_id + 1),
+        ("round", None),
+        ("bid", round_id + 2),
+    ]
+    blocks = [e.block_number for e in events]
+    assert blocks == sorted(blocks)
+    for event, new_round in ((events[1], round_id + 1), (events[3], round_id + 2)):
+        assert event.data["previous_round_id"] == new_round - 1
+        assert event.data["round"]["id"] == new_round
+        assert event.data["round"]["highest_bid"] == "0"
+    assert events[3].data["last_winning_round"]["highest_bidder"] == bidder2.address
+
+
+def test_run_survives_failed_poll(
+    monkeypatch, feed, auction, mock_erc20, deployer, bidder1, song
+):
+    fund(auction, mock_erc20, deployer, bidder1)
+    asyncio.run(feed.poll())
+    snapshot = feed.snapshot
+    read, failures = feed._read, []
+
+    def flaky_read():
+        if not failures:
+            failures.append(snapshot.block_number)
+            raise TimeoutError("upstream timed out")
+        return read()
+
+    monkeypatch.setattr(feed, "_read", flaky_read)
+    subscriber = feed.subscribe()
+    auction.bid(100, song, sender=bidder1)
+
+    async def next_events():
+        task = asyncio.create_task(feed.run(interval=0))
+        try:
+            return [
+                await asyncio.wait_for(subscriber.get(), 10),
+                await asyncio.wait_for(subscriber.get(), 10),
+            ]
+        finally:
+            task.cancel()
+
+    snapshot_event, bid_event = asyncio.run(next_events())
+    assert failures
+    assert snapshot_event.type == "snapshot"
+    # The failed poll's window is covered by the next one.
+    assert bid_event.type == "bid"
+    assert bid_event.data["amount"] == "100"
+    assert feed.subscribers == 1
+
+
+def test_slow_subscriber_is_resynced(feed):
+    subscriber = Subscriber(maxsize=2)
+    subscriber.offer(Event("bid", 1))
+    subscriber.offer(Event("bid", 2))
+    assert not subscriber.offer(Event("bid", 3))
+
+    subscriber.resync(Event("snapshot", 3))
+    # Covered by the snapshot
+    assert subscriber.offer(Event("bid", 3))
+    assert subscriber.offer(Event("bid", 4))
+    assert [(e.type, e.block_number) for e in drain(subscriber)] == [
+        ("snapshot", 3),
+        ("bid", 4),
+    ]
+    assert subscriber.resyncs == 1
+
+
+def test_publish_resyncs_full_subscribers(feed):
+    feed.max_queue = 1
+    subscriber = feed.subscribe()
+    feed.publish(Event("bid", feed.snapshot.block_number + 1))
+    (event,) = drain(subscriber)
+    assert event.type == "snapshot"
+    assert subscriber.resyncs == 1
+
+
+def test_event_stream(feed):
+    from aiohttp.test_utils import TestClient, TestServer
+
+    async def first_message():
+        async with TestClient(TestServer(create_app(feed))) as client:
+            response = await client.get("/events")
+            assert response.headers["Content-Type"] == "text/event-stream"
+            return await response.content.readuntil(b"\n\n")
+
+    message = asyncio.run(first_message())
+    assert message.startswith(b"event: snapshot\nid: %d\n" % feed.snapshot.block_number)
+    assert feed.subscribers == 0
@@ -0,0 +1,236 @@
+import asyncio
+
+import pytest
+
+from scripts.keeper import Keeper
+from scripts.transactions import (
+    Fees,
+    FeePolicy,
+    base_fee,
+    broadcast,
+    cancel,
+    gas_cost,
+    get_receipt,
+)
+
+GWEI = 10**9
+
+
+@pytest.fixture
+def fee_policy():
+    return FeePolicy(priority_fee=GWEI, max_fee_cap=100 * GWEI)
+
+
+def chain_time(chain, on_sleep=None):
+    """
+    A clock and sleep driven by the chain's pending timestamp.
+    """
+
+    def clock():
+        return chain.pending_timestamp
+
+    async def sleep(seconds):
+        chain.pending_timestamp += int(seconds)
+        if on_sleep is not None:
+            on_sleep()
+
+    return clock, sleep
+
+
+def test_fee_policy_bump(fee_policy):
+    fees = fee_policy.initial(10 * GWEI)
+    assert fees == Fees(max_fee=21 * GWEI, max_priority_fee=GWEI)
+    bumped = fee_policy.bump(fees)
+    assert bumped.max_fee == fees.max_fee * 115 // 100
+    assert bumped.max_priority_fee == fees.max_priority_fee * 115 // 100
+    # Never rounds a bump away
+    assert fee_policy.bump(Fees(1, 1)) == Fees(2, 2)
+    assert fee_policy.bump(Fees(100 * GWEI, GWEI)) is None
+
+
+def test_fee_policy_validation():
+    with pytest.raises(ValueError):
+        FeePolicy(priority_fee=GWEI, max_fee_cap=100 * GWEI, bump_percent=5)
+    with pytest.raises(ValueError):
+        FeePolicy(priority_fee=2 * GWEI, max_fee_cap=GWEI)
+
+
+def test_rolls_at_boundary(chain, auction, deployer, fee_policy):
+    round_id = auction.get_current_round_id()
+    clock, sleep = chain_time(chain)
+    keeper = Keeper(auction, deployer, fee_policy, clock=clock, sleep=sleep)
+
+    result = asyncio.run(keeper.roll_once())
+    assert result.rolled_by_us
+    assert result.round_id == round_id
+    assert result.lag == 0
+    assert auction.get_current_round_id() == round_id + 1
+    assert auction.get_current_round().start_time == auction.get_round_end_time(
+        round_id
+    )
+
+
+def test_waits_for_eligible_block(chain, auction, deployer, fee_policy):
+    round_id = auction.get_current_round_id()
+    end_time = auction.get_round_end_time(round_id)
+    # A clock running 5s ahead of the chain
+    clock, sleep = chain_time(chain)
+    keeper = Keeper(
+        auction,
+        deployer,
+        fee_policy,
+        clock=lambda: clock() + 5,
+        sleep=sleep,
+        poll_interval=1,
+    )
+
+    result = asyncio.run(keeper.roll_once())
+    assert result.rolled_by_us
+    assert result.lag == 0
+    assert auction.get_current_round().start_time == end_time
+
+
+def test_someone_else_rolls_first(chain, auction, deployer, bidder1, fee_policy):
+    round_id = auction.get_current_round_id()
+
+    def roll():
+        if auction.get_current_round_id() == round_id:
+            chain.pending_timestamp += 3
+            auction.end_round_and_start_new_round(sender=bidder1)
+
+    clock, sleep = chain_time(chain, on_sleep=roll)
+    keeper = Keeper(auction, deployer, fee_policy, clock=clock, sleep=sleep)
+    nonce = deployer.nonce
+
+    result = asyncio.run(keeper.roll_once())
+    assert not result.rolled_by_us
+    assert result.txn_hash is None
+    assert result.lag == 3
+    # Nothing was sent
+    assert deployer.nonce == nonce
+
+
+def test_cancels_when_outrolled_while_pending(
+    chain, auction, deployer, bidder1, fee_policy, manual_mining
+):
+    round_id = auction.get_current_round_id()
+    tester = chain.provider.tester.ethereum_tester
+    balance = deployer.balance
+
+    def mine():
+        ours = [
+            t
+            for t in tester._pending_transactions
+            if t["from"].lower() == deployer.address.lower()
+        ]
+        if not ours:
+            return
+        if auction.get_current_round_id() == round_id:
+            # A competitor's roll is mined first; ours is left out of the
+            # block, e.g. for a lower tip.
+            txn = auction.end_round_and_start_new_round.as_transaction(
+                sender=bidder1,
+                gas_limit=1_000_000,
+                max_fee=100 * GWEI,
+                max_priority_fee=2 * GWEI,
+            )
+            broadcast(bidder1, txn)
+            tester._pending_transactions = [
+                t for t in tester._pending_transactions if t not in ours
+            ]
+            manual_mining()
+            tester._pending_transactions.extend(ours)
+        else:
+            manual_mining()
+
+    clock, sleep = chain_time(chain, on_sleep=mine)
+    keeper = Keeper(auction, deployer, fee_policy, clock=clock, sleep=sleep)
+
+    result = asyncio.run(keeper.roll_once())
+    assert not result.rolled_by_us
+    assert result.cancelled
+    assert auction.get_current_round_id() == round_id + 1
+    receipt = get_receipt(result.txn_hash)
+    assert receipt["gasUsed"] == 21_000
+    # The cancel is all we paid for.
+    assert balance - deployer.balance == gas_cost(receipt)
+
+
+def test_run_survives_failed_round(monkeypatch, chain, auction, deployer, fee_policy):
+    clock, sleep = chain_time(chain)
+    keeper = Keeper(auction, deployer, fee_policy, clock=clock, sleep=sleep)
+    round_id = auction.get_current_round_id()
+
+    # The first broadcast is rejected, e.g. by a node that is down.
+    failures = [ConnectionError("node down")]
+
+    def flaky_broadcast(account, txn):
+        if failures:
+            raise failures.pop()
+        return broadcast(account, txn)
+
+    # Stops `run` once the round after the failed one has been rolled.
+    roll_once = keeper.roll_once
+    results = []
+
+    async def roll_until_stopped():
+        if results:
+            raise asyncio.CancelledError
+        results.append(await roll_once())
+
+    monkeypatch.setattr("scripts.keeper.broadcast", flaky_broadcast)
+    keeper.roll_once = roll_until_stopped
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(keeper.run())
+    assert not failures
+    assert results[0].rolled_by_us
+    assert results[0].round_id == round_id
+    assert auction.get_current_round_id() == round_id + 1
+
+
+def test_replaces_stuck_roll(chain, auction, deployer, fee_policy, manual_mining):
+    round_id = auction.get_current_round_id()
+    sleeps = []
+
+    def mine_later():
+        sleeps.append(1)
+        # Leave the first submission pending past `replace_after`
+        if len(sleeps) == 5:
+            manual_mining()
+
+    clock, sleep = chain_time(chain, on_sleep=mine_later)
+    keeper = Keeper(
+        auction,
+        deployer,
+        fee_policy,
+        clock=clock,
+        sleep=sleep,
+        poll_interval=1,
+        replace_after=2,
+    )
+
+    result = asyncio.run(keeper.roll_once())
+    assert result.rolled_by_us
+    assert result.replacements >= 1
+    assert auction.get_current_round_id() == round_id + 1
+    txn = chain.provider.web3.eth.get_transaction(result.txn_hash)
+    assert txn["maxPriorityFeePerGas"] > fee_policy.priority_fee
+
+
+def test_cancel_pending_roll(chain, auction, deployer, fee_policy, manual_mining):
+    round_id = auction.get_current_round_id()
+    chain.pending_timestamp += auction.get_round_duration()
+    nonce = deployer.nonce
+    fees = fee_policy.initial(base_fee())
+    txn = auction.end_round_and_start_new_round.as_transaction(
+        sender=deployer, nonce=nonce, **fees.as_kwargs()
+    )
+    roll_hash = broadcast(deployer, txn)
+    cancel_hash = cancel(deployer, nonce, fee_policy.bump(fees))
+    manual_mining()
+
+    assert get_receipt(roll_hash) is None
+    receipt = get_receipt(cancel_hash)
+    assert receipt["status"] == 1
+    assert receipt["gasUsed"] == 21_000
+    assert auction.get_current_round_id() == round_id
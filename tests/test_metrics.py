@@ -0,0 +1,201 @@
+import urllib.request
+
+import pytest
+
+from scripts.metrics import (
+    AuctionMetrics,
+    Counter,
+    Gauge,
+    Histogram,
+    Metric,
+    run,
+    serve,
+)
+
+
+@pytest.fixture
+def exporter(auction, multicall_address):
+    exporter = AuctionMetrics(auction, multicall_address=multicall_address)
+    exporter.poll()
+    return exporter
+
+
+def test_histogram_render():
+    histogram = Histogram("gas", "Gas used", (100, 200))
+    histogram.observe(50)
+    histogram.observe(150)
+    histogram.observe(250)
+    assert histogram.render().splitlines() == [
+        "# HELP gas Gas used",
+        "# TYPE gas histogram",
+        'gas_bucket{le="100"} 1',
+        'gas_bucket{le="200"} 2',
+        'gas_bucket{le="+Inf"} 3',
+        "gas_sum 450",
+        "gas_count 3",
+    ]
+
+
+def test_counter_and_gauge_render():
+    counter = Counter("bids", "Bids seen")
+    counter.inc(2)
+    gauge = Gauge("round", "Round id")
+    gauge.set(7)
+    assert counter.render().splitlines()[-1] == "bids_total 2"
+    assert gauge.render().splitlines()[-1] == "round 7"
+    with pytest.raises(ValueError):
+        counter.inc(-1)
+
+
+def test_metric_is_abstract():
+    with pytest.raises(TypeError):
+        Metric("metric", "No samples")
+
+
+def test_round_gauges(chain, exporter, auction):
+    assert exporter.round_id.value == auction.get_current_round_id()
+    assert exporter.seconds_until_end.value == (
+        auction.get_current_round().end_time - chain.blocks.head.timestamp
+    )
+    # No new block, nothing to do
+    assert not exporter.poll()
+
+
+def test_bids_refunds_and_gas(
+    exporter, auction, mock_erc20, deployer, bidder1, bidder2, song
+):
+    mock_erc20.mint(bidder1, 100_0000, sender=deployer)
+    mock_erc20.mint(bidder2, 100_0000, sender=deployer)
+    mock_erc20.approve(auction.address, 1000, sender=bidder1)
+    mock_erc20.approve(auction.address, 1000, sender=bidder2)
+    exporter.poll()
+
+    receipts = [
+        auction.bid(100, song, sender=bidder1),
+        auction.bid(200, song, sender=bidder2),
+        auction.bid(300, song, sender=bidder1),
+    ]
+    auction.bid(50, song, sender=bidder2, raise_on_revert=False)
+    assert exporter.poll()
+
+    assert exporter.bids.value == 3
+    assert exporter.highest_bid.value == 300
+    assert exporter.refunded.value == 100 + 200
+    assert exporter.bid_gas.count == 3
+    assert exporter.bid_gas.sum == sum(r.gas_used for r in receipts)
+    assert exporter.reverted_gas.value > 0
+
+
+def test_block_receipts(
+    monkeypatch, chain, exporter, auction, mock_erc20, deployer, bidder1, song
+):
+    mock_erc20.mint(bidder1, 100_0000, sender=deployer)
+    mock_erc20.approve(auction.address, 1000, sender=bidder1)
+    exporter.poll()
+    receipt = auction.bid(100, song, sender=bidder1)
+    chain.mine()
+
+    # eth-tester has no eth_getBlockReceipts, so it is emulated here.
+    web3 = chain.provider.web3
+    get_block, get_receipt = web3.eth.get_block, web3.eth.get_transaction_receipt
+    requested = []
+
+    def get_block_receipts(number):
+        requested.append(number)
+        return [get_receipt(txn) for txn in get_block(number)["transactions"]]
+
+    def get_transaction_receipt(txn_hash):
+        pytest.fail("receipts are read per block")
+
+    monkeypatch.setattr(web3.eth, "get_block_receipts", get_block_receipts)
+    monkeypatch.setattr(web3.eth, "get_transaction_receipt", get_transaction_receipt)
+    assert exporter.poll()
+
+    # Only the block with an auction transaction is requested.
+    assert requested == [receipt.block_number]
+    assert exporter.bid_gas.count == 1
+    assert exporter.bid_gas.sum == receipt.gas_used
+
+
+def test_roll_metrics(chain, exporter, auction, mock_erc20, deployer, bidder1, song):
+    mock_erc20.mint(bidder1, 100_0000, sender=deployer)
+    mock_erc20.approve(auction.address, 1000, sender=bidder1)
+    round_id = auction.get_current_round_id()
+
+    # Roll once so the exporter watches the next round from its start
+    chain.pending_timestamp += auction.get_round_duration()
+    chain.mine()
+    first_roll = auction.end_round_and_start_new_round(sender=deployer)
+    exporter.poll()
+    assert exporter.round_id.value == round_id + 1
+    # The first round was only partially watched
+    assert exporter.bids_per_round.count == 0
+
+    auction.bid(100, song, sender=bidder1)
+    auction.bid(150, song, sender=bidder1)
+    end_time = auction.get_current_round().end_time
+    chain.pending_timestamp = end_time + 7
+    receipt = auction.end_round_and_start_new_round(sender=deployer)
+    exporter.poll()
+
+    assert exporter.round_id.value == round_id + 2
+    assert exporter.bids_per_round.count == 1
+    assert exporter.bids_per_round.sum == 2
+    assert exporter.last_round_burned.value == 150
+    assert exporter.burned.value == 150
+    assert exporter.last_keeper_lag.value == 7
+    assert exporter.roll_gas.count == 2
+    assert exporter.roll_gas.sum == first_roll.gas_used + receipt.gas_used
+
+
+def test_run_survives_failed_poll(
+    monkeypatch, exporter, auction, mock_erc20, deployer, bidder1, song
+):
+    mock_erc20.mint(bidder1, 100_0000, sender=deployer)
+    mock_erc20.approve(auction.address, 1000, sender=bidder1)
+    exporter.poll()
+    receipt = auction.bid(100, song, sender=bidder1)
+
+    # The receipts read fails once, after the bid logs were already read.
+    receipts = exporter._receipts
+    failures = [RuntimeError("rpc down")]
+
+    def flaky_receipts(number, hashes):
+        if failures:
+            raise failures.pop()
+        return receipts(number, hashes)
+
+    class Stop(Exception):
+        pass
+
+    sleeps = []
+
+    def sleep(interval):
+        sleeps.append(interval)
+        if len(sleeps) == 2:
+            raise Stop
+
+    monkeypatch.setattr(exporter, "_receipts", flaky_receipts)
+    with pytest.raises(Stop):
+        run(exporter, interval=5, sleep=sleep)
+
+    assert sleeps == [5, 5]
+    assert exporter.poll_errors.value == 1
+    assert "songcoin_auction_poll_errors_total 1" in exporter.render()
+    # The retry counts the bid once, not again on top of the failed poll.
+    assert exporter.bids.value == 1
+    assert exporter.bid_gas.count == 1
+    assert exporter.bid_gas.sum == receipt.gas_used
+
+
+def test_scrape(exporter):
+    server = serve(exporter, host="127.0.0.1", port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode()
+            assert response.headers["Content-Type"].startswith("text/plain")
+    finally:
+        server.shutdown()
+    assert f"songcoin_auction_round_id {exporter.round_id.value}" in body
+    assert "# TYPE songcoin_auction_keeper_lag_seconds histogram" in body